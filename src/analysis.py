@@ -1,7 +1,7 @@
 import pandas as pd
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from deep_translator import GoogleTranslator
-import time
+
+from domain.lexicons import detect_language, matcher_for, sentiment_lexicon
 
 # --- Configurações ---
 ARQUIVO_INPUT = 'data/noticias_global.csv'
@@ -23,20 +23,17 @@ PALAVRAS_CHAVE = {
     'threat': 2.0
 }
 
-def traduzir_texto(texto):
-    """Traduz para inglês usando o Google Translate (free version)"""
-    if not isinstance(texto, str) or len(texto) < 3:
-        return ""
-    try:
-        # A deep-translator é ótima, mas pode ser lenta se tiver muitas linhas.
-        # Em produção real, usaríamos uma API paga.
-        tradutor = GoogleTranslator(source='auto', target='en')
-        return tradutor.translate(texto)
-    except Exception as e:
-        return texto # Se falhar, retorna o original
+_analisadores = {}
+
+def analisador_para(idioma):
+    """VADER com o léxico local do idioma somado ao inglês (sem tradução)"""
+    if idioma not in _analisadores:
+        analyzer = SentimentIntensityAnalyzer()
+        analyzer.lexicon.update(sentiment_lexicon(idioma) or {})
+        _analisadores[idioma] = analyzer
+    return _analisadores[idioma]
 
 def analisar_risco(df):
-    analyzer = SentimentIntensityAnalyzer()
     
     print("--- Iniciando Análise de Inteligência ---")
     
@@ -58,29 +55,19 @@ def analisar_risco(df):
         titulo_orig = row['titulo']
         regiao = row['regiao']
         
-        # 1. TRADUÇÃO (Normalização)
-        # Só traduz se não for das fontes em inglês para economizar tempo
-        if regiao in ['Brasil', 'Europa'] and 'BBC' not in row['fonte']: 
-            texto_en = traduzir_texto(titulo_orig)
-            # Pequeno delay para não bloquear o IP do tradutor
-            time.sleep(0.5) 
-        else:
-            texto_en = titulo_orig
+        texto = titulo_orig if isinstance(titulo_orig, str) else ""
+
+        # 1. IDIOMA (detecção local, sem tradução pela rede)
+        idioma = detect_language(texto)
             
-        # 2. ANÁLISE DE SENTIMENTO (VADER)
+        # 2. ANÁLISE DE SENTIMENTO (VADER + léxico do idioma)
         # O VADER retorna 'compound': -1 (Muito Negativo) a +1 (Muito Positivo)
-        scores = analyzer.polarity_scores(texto_en)
+        scores = analisador_para(idioma).polarity_scores(texto)
         sentimento = scores['compound']
         
-        # 3. PESO DAS PALAVRAS (Keyword Matching)
-        peso_palavras = 0
-        texto_lower = texto_en.lower()
-        
-        palavras_encontradas = []
-        for palavra, peso in PALAVRAS_CHAVE.items():
-            if palavra in texto_lower:
-                peso_palavras += peso
-                palavras_encontradas.append(palavra)
+        # 3. PESO DAS PALAVRAS (léxicos pt/es/ru mapeados para as chaves em inglês)
+        palavras_encontradas = list(dict.fromkeys(matcher_for(PALAVRAS_CHAVE, idioma).labels(texto)))
+        peso_palavras = sum(PALAVRAS_CHAVE[p] for p in palavras_encontradas)
         
         # 4. CÁLCULO DO SCORE DE "DOOM" (A Lógica do Relógio)
         # Lógica: Sentimento Negativo + Palavras de Guerra = ALTO RISCO
@@ -93,10 +80,10 @@ def analisar_risco(df):
         # O Score Final é a soma do medo (sentimento) + peso das palavras (contexto)
         score_risco = fator_medo + peso_palavras
         
-        print(f"[{regiao}] Risco: {score_risco:.2f} | Termos: {palavras_encontradas} | {texto_en[:50]}...")
+        print(f"[{regiao}/{idioma}] Risco: {score_risco:.2f} | Termos: {palavras_encontradas} | {texto[:50]}...")
 
         nova_linha = row.to_dict()
-        nova_linha['titulo_en'] = texto_en
+        nova_linha['idioma'] = idioma
         nova_linha['sentimento'] = sentimento
         nova_linha['score_risco'] = score_risco
         nova_linha['palavras_chave'] = ", ".join(palavras_encontradas)
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from application.snapshot import VIEWS, SnapshotCache
+from infra.repository import SQLiteRepo
+
+DB_PATH = os.getenv("DOOMSDAY_DB", os.path.join("data", "doomsday.db"))
+
+class RiskApiServer(ThreadingHTTPServer):
+    """
+    API JSON somente-leitura sobre o snapshot em memória:
+      GET /v1/risk        -> risco global + minutos
+      GET /v1/categories  -> risco por categoria (72h)
+      GET /v1/regions     -> risco por região x categoria (72h)
+      GET /v1/latest      -> últimas notícias pontuadas
+      GET /v1/snapshot    -> tudo acima
+    Respostas levam ETag + Cache-Control; If-None-Match igual -> 304 sem corpo.
+    """
+    daemon_threads = True
+
+    def __init__(self, cache: SnapshotCache, host: str = "127.0.0.1", port: int = 8080,
+                 max_age_s: int = 5):
+        self.cache = cache
+        self.cache_control = f"public, max-age={max_age_s}, stale-while-revalidate={max_age_s * 6}"
+        super().__init__((host, port), _ApiHandler)
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    server: RiskApiServer
+    protocol_version = "HTTP/1.1"  # keep-alive: pollers reaproveitam a conexão
+
+    def log_message(self, format, *args):  # silencioso em carga
+        pass
+
+    def _send(self, status: int, body: bytes, etag: str = "", head: bool = False) -> None:
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", self.server.cache_control)
+        if status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304 and not head:
+            self.wfile.write(body)
+
+    def do_GET(self, head: bool = False):
+        m = re.fullmatch(r"/v1/(\w+)/?", self.path.split("?", 1)[0])
+        if not m or m.group(1) not in VIEWS:
+            return self._send(404, b'{"error":"not found"}', head=head)
+        try:
+            snap = self.server.cache.get()
+        except Exception as ex:
+            return self._send(503, json.dumps({"error": repr(ex)}).encode("utf-8"), head=head)
+
+        body, etag = snap.views[m.group(1)]
+        if etag in self.headers.get("If-None-Match", ""):
+            return self._send(304, b"", etag)
+        return self._send(200, body, etag, head=head)
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+if __name__ == "__main__":
+    # python api.py --port 8080   (a partir de src/)
+    parser = argparse.ArgumentParser(description="API JSON somente-leitura do risco global.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--check-interval-s", type=float, default=1.0,
+                        help="com que frequência olhar o data_version do banco")
+    parser.add_argument("--max-age-s", type=int, default=5, help="Cache-Control max-age")
+    args = parser.parse_args()
+
+    cache = SnapshotCache(SQLiteRepo(args.db), check_interval_s=args.check_interval_s)
+    cache.get()  # aquece antes de aceitar conexões
+    server = RiskApiServer(cache, host=args.host, port=args.port, max_age_s=args.max_age_s)
+    print(f"API em http://{args.host}:{args.port}/v1/risk")
+    server.serve_forever()
@@ -1,15 +1,27 @@
 import os
+import time
+from dataclasses import asdict
+from typing import Optional
+import numpy as np
 import streamlit as st
 import pandas as pd
 import streamlit.components.v1 as components
 
-from clock_component import get_clock_html
-from infra.repository import SQLiteRepo
-from application.use_cases import refresh_pipeline
-from infra.official_clock import fetch_official_clock
-from infra.official_timeline import fetch_timeline_from_wikipedia
-
-DB_PATH = os.path.join("data", "doomsday.db")
+from infra.repository import GLOBAL_RISK_WINDOW, SQLiteRepo
+from domain.scoring import (LABELS, ScoringConfig, labels_from, reweight,
+                            risk_to_minutes, weights_vector)
+from application.snapshot import (LATEST_COLUMNS, load_dashboard_snapshot, official_timeline,
+                                  publish_dashboard_snapshot)
+from application.use_cases import REFRESH_REUSE_S, refresh_pipeline
+from infra.alerts import AnomalyMonitor
+from infra.source_scheduler import SourceScheduler
+from infra.sources import REGION_GROUPS
+
+DB_PATH = os.getenv("DOOMSDAY_DB", os.path.join("data", "doomsday.db"))
+# teto do refresh: fontes lentas ficam para o próximo, a página não trava
+REFRESH_DEADLINE_S = float(os.getenv("DOOMSDAY_REFRESH_DEADLINE_S", "20"))
+# snapshot mais velho que isso dispara um refresh ao abrir a página
+AUTO_REFRESH_S = 1800
 
 st.set_page_config(page_title="Doomsday Clock AI", layout="wide")
 
@@ -26,35 +38,119 @@ st.session_state.theme = st.sidebar.radio(
     index=0 if st.session_state.theme == "dark" else 1
 )
 
-repo = SQLiteRepo(DB_PATH)
+@st.cache_resource
+def get_repo(db_path: str) -> SQLiteRepo:
+    # schema/migrações uma vez por processo, não a cada rerun
+    return SQLiteRepo(db_path)
+
+repo = get_repo(DB_PATH)
+
+@st.cache_data(ttl=10)
+def get_data_version() -> int:
+    # única leitura do SQLite num rerun sem mudanças (e no máximo 1x a cada 10 s);
+    # escritas feitas por este app limpam o cache na hora
+    return repo.data_version()
+
+@st.cache_data(max_entries=64)
+def query(method: str, data_version: int, **kwargs):
+    # consultas do repo cacheadas por (método, argumentos, data_version):
+    # trocar tema/filtros não toca o banco; dado novo -> chave nova
+    return getattr(repo, method)(**kwargs)
+
+@st.cache_data(ttl=10)
+def get_dashboard_snapshot(version: Optional[str] = None):
+    # primeira tela inteira numa única leitura por chave (None -> versão ativa resolvida no SQL),
+    # gravada pelo refresh_pipeline / scorers
+    return load_dashboard_snapshot(repo, version)
 
 # ---------------------------
 # Data Refresh (cached)
 # ---------------------------
-@st.cache_data(ttl=1800)  # 30 min
-def run_refresh():
+@st.cache_data(ttl=AUTO_REFRESH_S)
+def run_refresh(force: bool = False):
     # Não passe objetos não-serializáveis pro cache.
     # Aqui funciona porque o refresh_pipeline usa o repo internamente.
-    return refresh_pipeline(repo)
-
-@st.cache_data(ttl=86400)  # 24h, oficial muda raramente
-def get_official_clock():
-    return fetch_official_clock()
-
-@st.cache_data(ttl=86400)
-def get_official_timeline():
-    return fetch_timeline_from_wikipedia()
-
-# Rodar refresh 1x por execução do app
-info = run_refresh()
+    # force (botão): fontes saudáveis mesmo antes do intervalo, sem reaproveitar refresh recente
+    result = refresh_pipeline(repo, deadline=REFRESH_DEADLINE_S, force=force,
+                              reuse_s=0.0 if force else REFRESH_REUSE_S)
+    get_data_version.clear()  # refresh de verdade (cache miss) -> dados novos
+    get_dashboard_snapshot.clear()
+    return result
+
+# Só coleta ao abrir a página se o snapshot estiver velho (ou não existir)
+snap = get_dashboard_snapshot()
+if snap is None or time.time() - snap["created_ts"] > AUTO_REFRESH_S:
+    run_refresh()
+    snap = get_dashboard_snapshot()
 
 # Botão manual para forçar refresh
 if st.sidebar.button("Atualizar agora (coletar + recalcular)"):
     run_refresh.clear()
-    info = run_refresh()
+    info = run_refresh(force=True)
+    snap = get_dashboard_snapshot()
     st.sidebar.success(
         f"Atualizado. Coletado: {info['items_collected']} | Scored: {info['items_scored']}"
     )
+    if not info["items_collected"] and not info["coalesced"]:
+        st.sidebar.caption(
+            "Nenhuma notícia nova. Fontes com falhas recentes (backoff) ou circuito aberto "
+            "ficam de fora mesmo no refresh manual; veja \"Status das fontes\" em Metodologia."
+        )
+    if info["coalesced"]:
+        st.sidebar.caption("Outra sessão acabou de atualizar; resultado dela reaproveitado.")
+    if info["skipped_sources"]:
+        st.sidebar.caption(
+            f"Prazo de {REFRESH_DEADLINE_S:.0f}s: {len(info['skipped_sources'])} fonte(s) "
+            f"ficaram para o próximo refresh ({', '.join(info['skipped_sources'][:5])})."
+        )
+
+if snap is None:
+    # versão ativa sem snapshot ainda (ex.: recém-ativada por backfill)
+    snap = publish_dashboard_snapshot(repo)
+    get_dashboard_snapshot.clear()
+
+# versão de scoring exibida (backfills gravam versões lado a lado). A escolha é
+# da sessão: a versão ativa (padrão do dashboard e da API) só muda por backfill --activate.
+versions = snap["versions"]
+active_version = snap["scoring_version"]
+sel_version = active_version
+if len(versions) > 1:
+    if st.session_state.get("scoring_version") not in versions:
+        st.session_state.scoring_version = active_version
+    sel_version = st.sidebar.selectbox("Versão do scoring", versions, key="scoring_version")
+    st.sidebar.caption(f"Versão ativa (dashboard/API): {active_version}")
+if sel_version != active_version:
+    sel_snap = get_dashboard_snapshot(sel_version)
+    if sel_snap is None or sel_snap["data_version"] < get_data_version():
+        # versão não ativa: o refresh não publica o snapshot dela, monta sob demanda
+        sel_snap = publish_dashboard_snapshot(repo, refresh_official=False, version=sel_version)
+        get_dashboard_snapshot.clear()
+    snap = sel_snap
+
+@st.cache_resource(ttl=600, max_entries=4)
+def get_score_components(version: str, data_version: int) -> np.ndarray:
+    # matriz N x 4 (sentiment, keywords, source_weight, recency) carregada 1x;
+    # cache_resource evita copiar o array a cada rerun dos sliders
+    rows = repo.fetch_score_components(version)
+    return np.asarray(rows, dtype=np.float64).reshape(-1, 4)
+
+@st.cache_data(ttl=60, max_entries=4)
+def get_source_states(data_version: int):
+    return SourceScheduler(DB_PATH).states()
+
+@st.cache_data(ttl=60, max_entries=4)
+def get_recent_alerts(data_version: int):
+    return AnomalyMonitor(DB_PATH).recent_alerts(limit=20)
+
+@st.cache_data(ttl=60)
+def get_official_timeline():
+    # gravada no SQLite; se algum dado oficial venceu, atualiza em segundo plano
+    return official_timeline(repo)
+
+def _age(seconds) -> str:
+    if seconds is None:
+        return "nunca"
+    return f"há {seconds / 3600:.0f} h" if seconds >= 3600 else f"há {seconds / 60:.0f} min"
 
 # ---------------------------
 # Tabs
@@ -74,38 +170,57 @@ with tab_overview:
 
     c1, c2, c3 = st.columns([2, 1, 1], vertical_alignment="center")
     with c2:
-        st.metric("Risco Global (0–1)", f"{info['global_risk']:.2f}")
+        st.metric("Risco Global (0–1)", f"{snap['global_risk']:.2f}")
     with c3:
-        st.metric("Seu modelo — minutos", f"{info['minutes_to_midnight']:.2f}")
+        st.metric("Seu modelo — minutos", f"{snap['minutes_to_midnight']:.2f}")
 
     # --- oficial com proteção ---
     st.markdown("### Comparação com o Doomsday Clock oficial")
 
-    try:
-        official = get_official_clock()
-
+    official = snap["official"]
+    if official:
         left, right = st.columns([1, 1])
         with left:
-            st.metric("Oficial (Bulletin) — segundos", f"{official.seconds_to_midnight}")
-            if official.as_of:
-                st.caption(f"Atualizado em: {official.as_of.isoformat()}")
+            st.metric("Oficial (Bulletin) — segundos", f"{official['seconds_to_midnight']}")
+            if official["as_of"]:
+                st.caption(f"Atualizado em: {official['as_of']}")
+            fresh = snap["official_freshness"]["clock"]
+            st.caption(f"Verificado {_age(time.time() - official['fetched_ts'])}"
+                       + (" (desatualizado; nova tentativa em segundo plano)" if fresh["stale"] else ""))
             st.caption("Fonte oficial: Bulletin (link na aba Metodologia)")
 
         with right:
-            model_seconds = int(info["minutes_to_midnight"] * 60)
-            st.metric("Seu modelo — segundos", f"{model_seconds}")
-            delta_sec = model_seconds - official.seconds_to_midnight
-            st.metric("Delta (modelo - oficial) em segundos", f"{delta_sec:+d}")
+            st.metric("Seu modelo — segundos", f"{snap['model_seconds']}")
+            st.metric("Delta (modelo - oficial) em segundos", f"{snap['delta_seconds']:+d}")
+    else:
+        st.warning("Valor oficial ainda não disponível (buscado em segundo plano, sem travar a página).")
+        if snap["official_error"]:
+            st.caption(snap["official_error"])
+
+    # --- hotspots: risco por região x categoria (agregados incrementais) ---
+    st.markdown("### Risco por região (últimas 72h)")
+
+    if not snap["regions"]:
+        st.info("Sem dados por região ainda.")
+    else:
+        df_bd = pd.DataFrame(snap["regions"], columns=["region", "category", "n", "risk"])
 
-    except Exception as e:
-        st.warning("Não foi possível carregar o valor oficial agora (falha de rede ou parsing).")
-        st.caption(str(e))
+        hot_cols = st.columns(len(REGION_GROUPS))
+        for col, (group, regions) in zip(hot_cols, REGION_GROUPS.items()):
+            nuc = df_bd[df_bd["region"].isin(regions) & (df_bd["category"] == "Nuclear")]
+            if nuc["n"].sum():
+                risk_nuc = (nuc["risk"] * nuc["n"]).sum() / nuc["n"].sum()
+                col.metric(f"Nuclear — {group}", f"{risk_nuc:.2f}", help=f"{int(nuc['n'].sum())} itens")
+            else:
+                col.metric(f"Nuclear — {group}", "—")
+
+        pivot = df_bd.pivot(index="region", columns="category", values="risk")
+        st.dataframe(pivot.style.format("{:.2f}", na_rep="—"))
 
     st.divider()
 
     # --- relógio visual ---
-    clock_html = get_clock_html(info["minutes_to_midnight"], theme=st.session_state.theme)
-    components.html(clock_html, height=560)
+    components.html(snap["clock_html"][st.session_state.theme], height=560)
 
     st.caption("⚠️ Índice experimental baseado em RSS + análise automática. Não é o Doomsday Clock oficial.")
 # ---------------------------
@@ -114,10 +229,13 @@ with tab_overview:
 with tab_feed:
     st.subheader("Feed de Inteligência")
 
-    rows = repo.fetch_latest(limit=250)
-    df = pd.DataFrame(rows, columns=[
-        "source", "category", "title", "url", "published_at", "risk", "label", "summary"
-    ])
+    search = st.text_input("Buscar (título e resumo)", "").strip()
+    if search:
+        df = pd.DataFrame(query("search_news", get_data_version(), text=search, limit=250,
+                                 version=sel_version),
+                          columns=LATEST_COLUMNS)
+    else:
+        df = pd.DataFrame(snap["latest"], columns=LATEST_COLUMNS)
 
     # normaliza
     if df.empty:
@@ -197,14 +315,73 @@ with tab_method:
 - **Sentimento (VADER):** textos mais negativos aumentam risco  
 - **Palavras-chave:** termos de risco existencial (guerra, nuclear, pandemia, IA, clima)  
 - **Peso por fonte:** fontes reconhecidas têm peso maior  
-- **Recência:** notícias recentes pesam mais  
+- **Recência:** notícias recentes pesam mais (decaimento contínuo, meia-vida de 36h)  
 
-O risco global é a **média** dos scores mais recentes.  
+O risco global é a **média** dos scores mais recentes, com a recência recalculada no momento da leitura.  
 Depois convertemos risco → **minutos para midnight** (calibrado para não colapsar em 0.1).
 
 > Este sistema é experimental e serve como demo de pipeline/arquitetura + visualização.
 """)
 
+    # --- what-if: re-pesa os componentes já gravados, sem rodar VADER de novo ---
+    st.markdown("### Simulador de pesos (what-if)")
+
+    base_cfg = query("version_config", get_data_version(), version=sel_version)
+    w1, w2, w3, w4 = st.columns(4)
+    cfg = ScoringConfig(
+        w_sentiment=w1.slider("Sentimento", 0.0, 1.0, base_cfg.w_sentiment, 0.05),
+        w_keywords=w2.slider("Palavras-chave", 0.0, 1.0, base_cfg.w_keywords, 0.05),
+        w_source=w3.slider("Fonte", 0.0, 1.0, base_cfg.w_source, 0.05),
+        w_recency=w4.slider("Recência", 0.0, 1.0, base_cfg.w_recency, 0.05),
+    )
+
+    components_mx = get_score_components(sel_version, get_data_version())
+    if components_mx.shape[0] == 0:
+        st.info("Sem scores ainda para simular.")
+    else:
+        t0 = time.perf_counter()
+        finals = reweight(components_mx, cfg)
+        label_counts = np.bincount(labels_from(finals), minlength=len(LABELS))
+        sim_risk = float(finals[:GLOBAL_RISK_WINDOW].mean())
+        sim_minutes = risk_to_minutes(sim_risk)
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Risco global simulado", f"{sim_risk:.2f}",
+                  f"{sim_risk - snap['global_risk']:+.2f}")
+        m2.metric("Minutos simulados", f"{sim_minutes:.2f}",
+                  f"{sim_minutes - snap['minutes_to_midnight']:+.2f}")
+        m3.metric("Soma dos pesos", f"{weights_vector(cfg).sum():.2f}")
+
+        st.bar_chart(pd.DataFrame({"itens": label_counts}, index=list(LABELS)))
+        st.caption(f"{components_mx.shape[0]} itens re-pesados em {elapsed_ms:.1f} ms.")
+
+    # --- agenda adaptativa das fontes ---
+    with st.expander("Status das fontes (polling adaptativo)"):
+        src_states = get_source_states(get_data_version())
+        if not src_states:
+            st.caption("Nenhuma fonte pollada ainda.")
+        else:
+            df_src = pd.DataFrame([asdict(x) for x in src_states])
+            for col in ("next_poll_at", "last_poll_at", "last_success_at"):
+                df_src[col] = pd.to_datetime(df_src[col], unit="s", utc=True)
+            df_src["interval_min"] = (df_src["interval_s"] / 60).round(1)
+            st.dataframe(
+                df_src[["source", "circuit", "failures", "rate_per_hour", "interval_min",
+                        "next_poll_at", "last_success_at", "last_error"]],
+                hide_index=True,
+            )
+
+    # --- alertas do detector online (EWMA + CUSUM) ---
+    with st.expander("Alertas de anomalia (últimos 20)"):
+        alerts = get_recent_alerts(get_data_version())
+        if not alerts:
+            st.caption("Nenhum alerta disparado ainda.")
+        else:
+            df_alerts = pd.DataFrame(alerts, columns=["created_at", "key", "value", "baseline", "message"])
+            df_alerts["created_at"] = pd.to_datetime(df_alerts["created_at"], unit="s", utc=True)
+            st.dataframe(df_alerts[["created_at", "key", "message"]], hide_index=True)
+
 # ---------------------------
 # Histórico (Plotly)
 # ---------------------------
@@ -216,8 +393,8 @@ with tab_history:
     # --- 1) Histórico oficial (Bulletin/Wiki) ---
     st.markdown("### Doomsday Clock — Histórico oficial (segundos para meia-noite)")
 
-    try:
-        timeline = get_official_timeline()
+    timeline, timeline_fresh = get_official_timeline()
+    if timeline:
         df_off = pd.DataFrame(
             [{"year": p.year, "seconds": p.seconds_to_midnight} for p in timeline]
         ).sort_values("year")
@@ -229,20 +406,21 @@ with tab_history:
             title="Histórico oficial — segundos para meia-noite",
         )
         st.plotly_chart(fig_off, width="stretch")
-
-    except Exception as e:
+        st.caption(f"Timeline verificada {_age(timeline_fresh['age_s'])}.")
+    else:
         st.warning(
-            "Não foi possível carregar o histórico oficial agora (falha de rede ou parsing). "
-            "Tente novamente mais tarde."
+            "Histórico oficial ainda não disponível (buscado em segundo plano). "
+            "Tente novamente em instantes."
         )
-        st.caption(str(e))
+    if timeline_fresh["last_error"]:
+        st.caption(f"Última falha ({timeline_fresh['failures']}x seguidas): {timeline_fresh['last_error']}")
 
     st.divider()
 
     # --- 2) Histórico do seu risco (SQLite) ---
     st.markdown("### Seu modelo — evolução do risco médio (0..1)")
 
-    hist = repo.fetch_risk_history(limit=500)
+    hist = snap["history"]
 
     if not hist:
         st.info("Sem histórico ainda. Use 'Atualizar agora' algumas vezes para gerar dados.")
@@ -257,4 +435,27 @@ with tab_history:
             y="risk",
             title="Evolução do risco médio (seu modelo)",
         )
-        st.plotly_chart(fig_risk, width="stretch")
\ No newline at end of file
+        st.plotly_chart(fig_risk, width="stretch")
+
+    st.divider()
+
+    # --- 3) Modelo x oficial (série diária pré-calculada, as-of join por ano) ---
+    st.markdown("### Seu modelo x oficial (segundos para meia-noite, por dia)")
+
+    cmp_rows = query("fetch_risk_vs_official", get_data_version(), version=sel_version)
+    if not cmp_rows:
+        st.info("Sem série comparativa ainda (é atualizada a cada refresh).")
+    else:
+        dfc = pd.DataFrame(cmp_rows, columns=["day", "risk", "model_minutes", "official_seconds"])
+        dfc["day"] = pd.to_datetime(dfc["day"], errors="coerce")
+        dfc["Seu modelo"] = dfc["model_minutes"] * 60
+        dfc["Oficial"] = dfc["official_seconds"]
+        fig_cmp = px.line(
+            dfc.melt(id_vars="day", value_vars=["Seu modelo", "Oficial"],
+                     var_name="série", value_name="seconds"),
+            x="day",
+            y="seconds",
+            color="série",
+            title="Seu modelo x oficial — segundos para meia-noite",
+        )
+        st.plotly_chart(fig_cmp, width="stretch")
\ No newline at end of file
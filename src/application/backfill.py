@@ -0,0 +1,101 @@
+import argparse
+import os
+from dataclasses import asdict
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Union
+
+from  domain.batch import NewsBatch, ScoreBatch
+from  domain.scoring import (DEFAULT_KEYWORDS, DEFAULT_SOURCE_WEIGHTS,
+                             ScoringConfig, score_batch)
+from  infra.repository import SQLiteRepo
+
+# estado do worker (preenchido pelo initializer do Pool)
+_cfg: ScoringConfig = ScoringConfig()
+_keywords: Dict[str, float] = DEFAULT_KEYWORDS
+_sources: Dict[str, float] = DEFAULT_SOURCE_WEIGHTS
+
+def _init_worker(cfg: ScoringConfig, keywords: Dict[str, float], sources: Dict[str, float]) -> None:
+    global _cfg, _keywords, _sources
+    _cfg, _keywords, _sources = cfg, keywords, sources
+
+def _score_chunk(chunk: NewsBatch) -> ScoreBatch:
+    # lotes colunares também encolhem o pickle entre processos
+    return score_batch(chunk, _cfg, _keywords, _sources)
+
+def _checkpoint_key(version: str) -> str:
+    return f"backfill:{version}:last_url"
+
+def backfill_scores(repo: SQLiteRepo,
+                    version: str,
+                    cfg: ScoringConfig = ScoringConfig(),
+                    keywords: Dict[str, float] = DEFAULT_KEYWORDS,
+                    sources: Dict[str, float] = DEFAULT_SOURCE_WEIGHTS,
+                    chunk_size: int = 500,
+                    workers: Optional[int] = None,
+                    activate: bool = False,
+                    restart: bool = False) -> Dict[str, Union[str, int]]:
+    """
+    Re-score de todo o `news` sob uma versão nomeada.
+    Lê em blocos (keyset por url), pontua num Pool de processos e grava em lote.
+    O checkpoint (última url gravada) fica em meta: rodar de novo continua de onde parou.
+    A spec inteira (cfg, keywords, sources) fica gravada com a versão; no fim, uma
+    varredura pontua o que entrou durante a execução atrás do checkpoint.
+    """
+    workers = workers or os.cpu_count() or 1
+    key = _checkpoint_key(version)
+    last_url = "" if restart else repo.get_meta(key, "")
+    scored = 0
+
+    with Pool(workers, initializer=_init_worker, initargs=(cfg, keywords, sources)) as pool:
+        while True:
+            # uma "onda" de blocos por vez: memória limitada a workers * chunk_size
+            wave: List[NewsBatch] = []
+            for _ in range(workers * 2):
+                chunk = repo.fetch_news_after(last_url, chunk_size)
+                if not chunk:
+                    break
+                wave.append(chunk)
+                last_url = chunk.url[-1]
+            if not wave:
+                break
+
+            # imap preserva a ordem -> checkpoint sempre monotônico
+            for chunk, scores in zip(wave, pool.imap(_score_chunk, wave)):
+                scored += repo.upsert_scores(scores, version=version, cfg=cfg,
+                                             keywords=keywords, sources=sources)
+                repo.set_meta(key, chunk.url[-1])
+
+        # notícias gravadas durante a execução com url abaixo do checkpoint
+        swept = 0
+        while True:
+            chunk = repo.fetch_unscored_news(version, chunk_size)
+            if not chunk:
+                break
+            n = repo.upsert_scores(pool.apply(_score_chunk, (chunk,)), version=version,
+                                   cfg=cfg, keywords=keywords, sources=sources)
+            if not n:
+                break
+            swept += n
+
+    if activate:
+        repo.set_active_version(version)
+
+    return {"version": version, "items_scored": scored + swept, "items_swept": swept}
+
+if __name__ == "__main__":
+    # python -m application.backfill v2 --workers 4 --activate   (a partir de src/)
+    parser = argparse.ArgumentParser(description="Re-score do arquivo sob uma versão de scoring.")
+    parser.add_argument("version")
+    parser.add_argument("--db", default=os.path.join("data", "doomsday.db"))
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--activate", action="store_true", help="torna a versão ativa ao final")
+    parser.add_argument("--restart", action="store_true", help="ignora o checkpoint salvo")
+    for field, value in asdict(ScoringConfig()).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=float, default=value)
+    args = parser.parse_args()
+
+    cfg = ScoringConfig(**{f: getattr(args, f) for f in asdict(ScoringConfig())})
+    print(backfill_scores(SQLiteRepo(args.db), args.version, cfg=cfg,
+                          chunk_size=args.chunk_size, workers=args.workers,
+                          activate=args.activate, restart=args.restart))
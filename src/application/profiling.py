@@ -0,0 +1,265 @@
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# funções instrumentadas pelo modo "hooks": (módulo, nome). Também são trocadas
+# nos outros módulos desta lista que as importaram por nome (from x import f).
+HOOKED = [
+    ("domain.lexicons", "detect_language"),
+    ("domain.scoring", "sentiment_score"),
+    ("domain.scoring", "keyword_score"),
+    ("domain.scoring", "source_weight"),
+    ("domain.scoring", "recency_score"),
+    ("domain.scoring", "recency_decay"),
+    ("domain.scoring", "label_from"),
+    ("domain.scoring", "infer_category"),
+    ("domain.scoring", "score_parts"),
+    ("domain.scoring", "score_item"),
+    ("domain.scoring", "score_batch"),
+    ("infra.collectors", "collect_news_until"),
+    ("application.use_cases", "ingest_sources"),
+    ("application.use_cases", "score_queued"),
+    ("application.snapshot", "publish_dashboard_snapshot"),
+    ("infra.retention", "maybe_run_retention"),
+]
+HOOKED_METHODS = [
+    ("infra.repository", "SQLiteRepo", "upsert_news"),
+    ("infra.repository", "SQLiteRepo", "upsert_scores"),
+    ("infra.repository", "SQLiteRepo", "dequeue_news"),
+    ("infra.repository", "SQLiteRepo", "ack_news"),
+]
+
+MODES = ("hooks", "cprofile", "sample")
+TOP_N = 40
+
+class CallStats:
+    """Contadores por função: chamadas, tempo acumulado (inclusivo) e máximo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # a coleta chama de várias threads
+        self.calls: Counter = Counter()
+        self.total: Dict[str, float] = {}
+        self.max: Dict[str, float] = {}
+
+    def record(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            self.calls[name] += 1
+            self.total[name] = self.total.get(name, 0.0) + elapsed
+            if elapsed > self.max.get(name, 0.0):
+                self.max[name] = elapsed
+
+    def report(self) -> List[Dict]:
+        return [
+            {"function": name, "calls": n,
+             "cumulative_s": round(self.total[name], 6),
+             "mean_us": round(self.total[name] / n * 1e6, 2),
+             "max_us": round(self.max[name] * 1e6, 2)}
+            for name, n in sorted(self.calls.items(), key=lambda kv: -self.total[kv[0]])
+        ]
+
+# contadores do bloco profiling() em curso neste contexto (thread/sessão); os
+# wrappers são do processo todo, mas só medem onde o bloco está ativo
+_active_stats: ContextVar[Optional[CallStats]] = ContextVar("profiling_stats", default=None)
+_hooks_lock = threading.Lock()
+_hooks_users = 0
+_hooks_undo: List[Tuple[object, str, object]] = []
+
+def _timed(fn, name: str):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        stats = _active_stats.get()
+        if stats is None:
+            return fn(*args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stats.record(name, time.perf_counter() - t0)
+    wrapper.__profiled__ = fn
+    return wrapper
+
+def _install_hooks() -> List[Tuple[object, str, object]]:
+    """Troca as funções de HOOKED/HOOKED_METHODS por versões cronometradas; devolve o que desfazer."""
+    # só os módulos já importados das listas, lidos pelo __dict__ (sem __getattr__
+    # de módulos preguiçosos, sem importar nada)
+    names = dict.fromkeys([m for m, _ in HOOKED] + [m for m, _, _ in HOOKED_METHODS])
+    modules = [sys.modules[n] for n in names if n in sys.modules]
+    undo = []
+    for module_name, attr in HOOKED:
+        module = sys.modules.get(module_name)
+        fn = vars(module).get(attr) if module else None
+        if fn is None or hasattr(fn, "__profiled__"):
+            continue
+        wrapper = _timed(fn, f"{module_name}.{attr}")
+        for m in modules:
+            if vars(m).get(attr) is fn:
+                setattr(m, attr, wrapper)
+                undo.append((m, attr, fn))
+    for module_name, cls_name, attr in HOOKED_METHODS:
+        module = sys.modules.get(module_name)
+        cls = vars(module).get(cls_name) if module else None
+        fn = cls.__dict__.get(attr) if cls else None
+        if fn is None or hasattr(fn, "__profiled__"):
+            continue
+        setattr(cls, attr, _timed(fn, f"{module_name}.{cls_name}.{attr}"))
+        undo.append((cls, attr, fn))
+    return undo
+
+def _acquire_hooks() -> None:
+    # blocos simultâneos (ex.: duas sessões) compartilham os mesmos wrappers
+    global _hooks_users, _hooks_undo
+    with _hooks_lock:
+        if _hooks_users == 0:
+            _hooks_undo = _install_hooks()
+        _hooks_users += 1
+
+def _release_hooks() -> None:
+    global _hooks_users, _hooks_undo
+    with _hooks_lock:
+        _hooks_users -= 1
+        if _hooks_users == 0:
+            for owner, attr, fn in reversed(_hooks_undo):
+                setattr(owner, attr, fn)
+            _hooks_undo = []
+
+class _Sampler(threading.Thread):
+    """Amostra a pilha da thread alvo a cada interval_s (custo fixo, sem hooks)."""
+
+    def __init__(self, target_ident: int, interval_s: float):
+        super().__init__(daemon=True)
+        self.target_ident = target_ident
+        self.interval_s = interval_s
+        self.leaf: Counter = Counter()
+        self.inclusive: Counter = Counter()
+        self.samples = 0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval_s):
+            frame = sys._current_frames().get(self.target_ident)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.leaf[_frame_key(frame)] += 1
+            seen = set()
+            while frame is not None:
+                key = _frame_key(frame, line=False)
+                if key not in seen and frame.f_code.co_filename != __file__:
+                    seen.add(key)
+                    self.inclusive[key] += 1
+                frame = frame.f_back
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+    def report(self) -> Dict:
+        n = max(self.samples, 1)
+        return {
+            "interval_s": self.interval_s,
+            "samples": self.samples,
+            "self": [{"frame": k, "samples": c, "share": round(c / n, 4)}
+                     for k, c in self.leaf.most_common(TOP_N)],
+            "inclusive": [{"function": k, "samples": c, "share": round(c / n, 4)}
+                          for k, c in self.inclusive.most_common(TOP_N)],
+        }
+
+def _frame_key(frame, line: bool = True) -> str:
+    code = frame.f_code
+    where = f"{os.path.basename(code.co_filename)}:{frame.f_lineno if line else code.co_firstlineno}"
+    return f"{code.co_name} ({where})"
+
+def _cprofile_report(prof: cProfile.Profile) -> List[Dict]:
+    # sem as entradas dos próprios wrappers de _timed (já estão em "functions")
+    stats = {k: v for k, v in pstats.Stats(prof).stats.items() if k[0] != __file__}
+    rows = sorted(stats.items(), key=lambda kv: -kv[1][3])[:TOP_N]
+    return [
+        {"function": f"{func} ({os.path.basename(file)}:{line})", "calls": nc, "primitive_calls": cc,
+         "own_s": round(tt, 6), "cumulative_s": round(ct, 6)}
+        for (file, line, func), (cc, nc, tt, ct, _callers) in rows
+    ]
+
+@contextmanager
+def profiling(mode: str = "hooks", sample_interval_s: float = 0.005) -> Iterator[Dict]:
+    """
+    Perfil do bloco, no modo escolhido:
+      hooks    -> chamadas/tempo acumulado das funções de HOOKED (só no contexto do bloco)
+      cprofile -> cProfile da thread atual (top TOP_N por tempo acumulado)
+      sample   -> amostragem da pilha da thread atual a cada sample_interval_s
+    Os contadores por função (hooks) entram em todos os modos. O dict
+    devolvido é preenchido ao sair do bloco (JSON-serializável).
+    """
+    if mode not in MODES:
+        raise ValueError(f"modo de profiling desconhecido: {mode!r} (use {', '.join(MODES)})")
+    report: Dict = {"mode": mode}
+    stats = CallStats()
+    _acquire_hooks()
+    token = _active_stats.set(stats)
+    prof = cProfile.Profile() if mode == "cprofile" else None
+    sampler = _Sampler(threading.get_ident(), sample_interval_s) if mode == "sample" else None
+    t0 = time.perf_counter()
+    if prof:
+        prof.enable()
+    if sampler:
+        sampler.start()
+    try:
+        yield report
+    finally:
+        if prof:
+            prof.disable()
+        if sampler:
+            sampler.stop()
+        report["wall_s"] = round(time.perf_counter() - t0, 6)
+        _active_stats.reset(token)
+        _release_hooks()
+        report["functions"] = stats.report()
+        if prof:
+            report["cprofile"] = _cprofile_report(prof)
+        if sampler:
+            report["sampling"] = sampler.report()
+
+def profile_mode_from_env() -> Optional[str]:
+    """DOOMSDAY_PROFILE=hooks|cprofile|sample liga o profiling do refresh_pipeline."""
+    mode = os.getenv("DOOMSDAY_PROFILE", "").strip().lower()
+    return mode if mode in MODES else None
+
+def write_report(report: Dict, name: str, out_dir: Optional[str] = None) -> str:
+    out_dir = out_dir or os.getenv("DOOMSDAY_PROFILE_DIR", os.path.join("data", "profiles"))
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{name}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}.json")
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, ensure_ascii=False, indent=2)
+    return path
+
+if __name__ == "__main__":
+    # python -m application.profiling --mode sample --limit 2000   (a partir de src/)
+    from  domain.scoring import score_batch, score_item
+    from  infra.repository import SQLiteRepo
+
+    parser = argparse.ArgumentParser(description="Perfil do scoring sobre notícias do banco.")
+    parser.add_argument("--db", default=os.path.join("data", "doomsday.db"))
+    parser.add_argument("--mode", choices=MODES, default="hooks")
+    parser.add_argument("--limit", type=int, default=1000, help="notícias pontuadas")
+    parser.add_argument("--per-item", action="store_true", help="score_item (um ThreatScore por item)")
+    parser.add_argument("--out-dir", default=None)
+    args = parser.parse_args()
+
+    batch = SQLiteRepo(args.db).fetch_news_after("", args.limit)
+    with profiling(args.mode) as report:
+        if args.per_item:
+            for item in batch:
+                score_item(item)
+        else:
+            score_batch(batch)
+    report["items"] = len(batch)
+    print(write_report(report, f"scoring-{args.mode}", args.out_dir))
@@ -0,0 +1,67 @@
+import argparse
+import os
+import socket
+import time
+import uuid
+from multiprocessing import Process
+from typing import Dict, Optional
+
+from  application.snapshot import publish_dashboard_snapshot
+from  application.use_cases import score_queued
+from  infra.alerts import AlertNotifier, AnomalyMonitor
+from  infra.repository import SQLiteRepo
+
+def run_scorer(db_path: str,
+               worker_id: Optional[str] = None,
+               batch_size: int = 200,
+               lease_s: float = 300,
+               idle_sleep_s: float = 5,
+               once: bool = False) -> Dict[str, int]:
+    """
+    Loop de um worker de scoring: drena a fila (score_queue) em lotes.
+    Um crash no meio só deixa o lease expirar; outro worker pega os itens.
+    `once=True` para quando a fila esvaziar.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    repo = SQLiteRepo(db_path)
+    monitor = AnomalyMonitor(db_path, notifier=AlertNotifier.from_env())
+    totals = {"items_scored": 0}
+
+    while True:
+        n = score_queued(repo, worker_id, batch_size=batch_size, lease_s=lease_s, monitor=monitor)
+        totals["items_scored"] += n
+        if n:
+            # dados novos -> snapshot do dashboard novo (oficial: o já gravado, sem rede)
+            publish_dashboard_snapshot(repo, refresh_official=False)
+        if n == 0:
+            if once:
+                return totals
+            time.sleep(idle_sleep_s)
+
+def _run(db_path: str, kwargs: dict) -> None:
+    print(run_scorer(db_path, **kwargs))
+
+if __name__ == "__main__":
+    # python -m application.scorer --db ../data/doomsday.db --processes 2   (a partir de src/)
+    parser = argparse.ArgumentParser(description="Workers de scoring que drenam a fila do SQLite.")
+    parser.add_argument("--db", default=os.path.join("data", "doomsday.db"))
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--lease-s", type=float, default=300)
+    parser.add_argument("--idle-sleep-s", type=float, default=5)
+    parser.add_argument("--once", action="store_true", help="sai quando a fila esvaziar")
+    parser.add_argument("--stats", action="store_true", help="só mostra a profundidade da fila")
+    args = parser.parse_args()
+
+    repo = SQLiteRepo(args.db)  # schema/migrações uma vez, antes de abrir os processos
+    if args.stats:
+        print(repo.queue_stats())
+        raise SystemExit(0)
+
+    opts = {"batch_size": args.batch_size, "lease_s": args.lease_s,
+            "idle_sleep_s": args.idle_sleep_s, "once": args.once}
+    procs = [Process(target=_run, args=(args.db, opts)) for _ in range(args.processes)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from  clock_component import get_clock_html
+from  domain.scoring import risk_to_minutes
+from  infra.deadline import Deadline
+from  infra.official_data import OfficialDataRefresher
+from  infra.official_timeline import TimelinePoint
+from  infra.repository import SQLiteRepo
+
+LATEST_COLUMNS = ["source", "category", "title", "url", "published_at", "risk", "label", "summary"]
+
+def _category_breakdown(rows) -> List[Dict]:
+    # risk_agg vem por (região, categoria): agrega só por categoria, ponderado por n
+    acc: Dict[str, List[float]] = {}
+    for _region, category, n, risk in rows:
+        a = acc.setdefault(category, [0, 0.0])
+        a[0] += n
+        a[1] += risk * n
+    return [{"category": c, "n": n, "risk": s / n}
+            for c, (n, s) in sorted(acc.items()) if n]
+
+def build_snapshot(repo: SQLiteRepo,
+                   latest_limit: int = 40,
+                   breakdown_hours: float = 72.0,
+                   now: Optional[float] = None,
+                   version: Optional[str] = None) -> Dict:
+    """Tudo que a Overview/Feed exibem (versão pedida ou a ativa), calculado uma vez (JSON-serializável)."""
+    now = time.time() if now is None else now
+    data_version = repo.data_version()
+    version = version or repo.active_version()
+    global_risk = repo.fetch_global_risk(now=now, version=version)
+    breakdown = repo.fetch_risk_breakdown(hours=breakdown_hours, now=now, version=version)
+    latest = [dict(zip(LATEST_COLUMNS, r)) for r in repo.fetch_latest(limit=latest_limit, version=version)]
+    return {
+        "data_version": data_version,
+        "scoring_version": version,
+        "generated_at": datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
+        "global_risk": global_risk,
+        "minutes_to_midnight": risk_to_minutes(global_risk),
+        "categories": _category_breakdown(breakdown),
+        "regions": [{"region": r, "category": c, "n": n, "risk": risk} for r, c, n, risk in breakdown],
+        "latest": latest,
+    }
+
+# ---------------------------
+# Snapshot da primeira tela do dashboard (gravado no banco após cada refresh)
+# ---------------------------
+DASHBOARD_SCHEMA = 2              # mude ao alterar o formato do payload
+DASHBOARD_LATEST = 250
+DASHBOARD_HISTORY = 500
+THEMES = ("dark", "light")
+
+# ---------------------------
+# Dados oficiais (relógio + timeline): refresher com ETag/backoff no SQLite
+# ---------------------------
+_official_lock = threading.Lock()   # um refresh em segundo plano por processo
+
+def refresh_official_data(repo: SQLiteRepo, deadline: Optional[Deadline] = None,
+                          force: bool = False) -> Dict[str, str]:
+    """Busca o que venceu (em paralelo) e espelha a timeline nova em official_timeline."""
+    refresher = OfficialDataRefresher(repo.db_path)
+
+    def mirror(name: str, status: str) -> None:
+        # também para buscas que terminam depois do prazo ("pending")
+        if name == "timeline" and status == "updated":
+            record = refresher.get("timeline")
+            repo.save_official_timeline(TimelinePoint(y, sec) for y, sec in record.payload)
+
+    return refresher.refresh(force=force, deadline=deadline, on_done=mirror)
+
+def refresh_official_data_async(repo: SQLiteRepo) -> bool:
+    """Dispara refresh_official_data numa thread se houver algo vencido; nunca bloqueia."""
+    if not OfficialDataRefresher(repo.db_path).due() or not _official_lock.acquire(blocking=False):
+        return False
+
+    def run():
+        try:
+            if "updated" in refresh_official_data(repo).values():
+                publish_dashboard_snapshot(repo, refresh_official=False)  # oficial novo na primeira tela
+        except Exception as ex:
+            print(f"   ❌ dados oficiais: {ex!r}")
+        finally:
+            _official_lock.release()
+
+    threading.Thread(target=run, daemon=True).start()
+    return True
+
+def official_timeline(repo: SQLiteRepo) -> Tuple[List[TimelinePoint], Dict]:
+    """Timeline gravada + frescor; se venceu, atualiza em segundo plano."""
+    refresh_official_data_async(repo)
+    points, _ = repo.load_official_timeline()
+    return points, OfficialDataRefresher(repo.db_path).freshness()["timeline"]
+
+def _official(refresher: OfficialDataRefresher) -> Tuple[Optional[Dict], Optional[str]]:
+    record = refresher.get("clock")
+    if record is None:
+        return None, None
+    official = dict(record.payload, fetched_ts=record.fetched_at) if record.payload else None
+    return official, record.last_error
+
+def build_dashboard_snapshot(repo: SQLiteRepo,
+                             now: Optional[float] = None,
+                             version: Optional[str] = None) -> Dict:
+    """build_snapshot + histórico, oficial (já gravado), delta e HTML do relógio prontos."""
+    now = time.time() if now is None else now
+    snap = build_snapshot(repo, latest_limit=DASHBOARD_LATEST, now=now, version=version)
+    minutes = snap["minutes_to_midnight"]
+    refresher = OfficialDataRefresher(repo.db_path)
+    official, official_error = _official(refresher)
+    model_seconds = int(minutes * 60)
+    snap.update({
+        "schema": DASHBOARD_SCHEMA,
+        "created_ts": now,
+        "versions": repo.list_versions(),
+        "history": [list(r) for r in repo.fetch_risk_history(limit=DASHBOARD_HISTORY,
+                                                             version=snap["scoring_version"])],
+        "official": official,
+        "official_error": official_error,
+        "official_freshness": refresher.freshness(now),
+        "model_seconds": model_seconds,
+        "delta_seconds": model_seconds - official["seconds_to_midnight"] if official else None,
+        "clock_html": {t: get_clock_html(minutes, theme=t) for t in THEMES},
+    })
+    return snap
+
+def load_dashboard_snapshot(repo: SQLiteRepo, scoring_version: Optional[str] = None) -> Optional[Dict]:
+    raw = repo.load_dashboard_snapshot(scoring_version)
+    if raw is None:
+        return None
+    snap = json.loads(raw)
+    return snap if snap.get("schema") == DASHBOARD_SCHEMA else None
+
+def publish_dashboard_snapshot(repo: SQLiteRepo,
+                               refresh_official: bool = True,
+                               deadline: Optional[Deadline] = None,
+                               version: Optional[str] = None) -> Dict:
+    """
+    Monta e grava o snapshot da versão (padrão: a ativa; chamado ao fim de cada refresh).
+    Com refresh_official, antes atualiza os dados oficiais vencidos (dentro do prazo).
+    """
+    version = version or repo.active_version()
+    if refresh_official:
+        try:
+            refresh_official_data(repo, deadline=deadline)
+        except Exception as ex:
+            print(f"   ❌ dados oficiais: {ex!r}")
+    repo.refresh_risk_vs_official(version=version)  # série modelo x oficial: só os dias tocados
+    snap = build_dashboard_snapshot(repo, version=version)
+    repo.save_dashboard_snapshot(snap["scoring_version"], snap["data_version"],
+                                 json.dumps(snap, ensure_ascii=False, separators=(",", ":")))
+    return snap
+
+# recortes servidos pela API (cada um serializado uma única vez por snapshot)
+VIEWS: Dict[str, Callable[[Dict], object]] = {
+    "snapshot": lambda d: d,
+    "risk": lambda d: {k: d[k] for k in ("data_version", "scoring_version", "generated_at",
+                                         "global_risk", "minutes_to_midnight")},
+    "categories": lambda d: d["categories"],
+    "regions": lambda d: d["regions"],
+    "latest": lambda d: d["latest"],
+}
+
+@dataclass(frozen=True)
+class Snapshot:
+    data: Dict
+    views: Dict[str, Tuple[bytes, str]]   # nome -> (JSON pronto, ETag)
+    built_at: float
+
+def _encode(data: Dict) -> Snapshot:
+    views = {}
+    for name, view in VIEWS.items():
+        body = json.dumps(view(data), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        views[name] = (body, '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"')
+    return Snapshot(data=data, views=views, built_at=time.time())
+
+class SnapshotCache:
+    """
+    Snapshot em memória invalidado pelo banco: a cada `check_interval_s` lê
+    repo.data_version(); só reconstrói se mudou ou se passou `max_age_s`
+    (o risco global decai com o tempo mesmo sem escritas).
+    """
+
+    def __init__(self, repo: SQLiteRepo,
+                 check_interval_s: float = 1.0,
+                 max_age_s: float = 300.0,
+                 builder: Callable[[SQLiteRepo], Dict] = build_snapshot):
+        self.repo = repo
+        self.check_interval_s = check_interval_s
+        self.max_age_s = max_age_s
+        self.builder = builder
+        self._lock = threading.Lock()
+        self._snap: Optional[Snapshot] = None
+        self._checked_at = 0.0
+
+    def get(self) -> Snapshot:
+        snap = self._snap
+        now = time.time()
+        if snap is not None and now - self._checked_at < self.check_interval_s:
+            return snap  # caminho quente: sem I/O, sem lock
+        with self._lock:
+            snap = self._snap
+            if snap is not None and now - self._checked_at < self.check_interval_s:
+                return snap  # outra thread já checou
+            stale = (snap is None
+                     or now - snap.built_at >= self.max_age_s
+                     or self.repo.data_version() != snap.data["data_version"])
+            if stale:
+                snap = _encode(self.builder(self.repo))
+                self._snap = snap
+            self._checked_at = time.time()
+            return snap
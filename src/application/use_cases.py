@@ -1,22 +1,199 @@
-from typing import Dict, List, Tuple
+import hashlib
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from  domain.scoring import score_item, risk_to_minutes
-from  infra.collectors import collect_news
+from  application.profiling import profile_mode_from_env, profiling, write_report
+from  application.snapshot import load_dashboard_snapshot, publish_dashboard_snapshot
+from  domain.scoring import SCORING_VERSION, score_batch
+from  infra.alerts import AlertNotifier, AnomalyMonitor
+from  infra.collectors import collect_news_until
+from  infra.deadline import Deadline
 from  infra.repository import SQLiteRepo
+from  infra.retention import RetentionPolicy, maybe_run_retention, retention_due
+from  infra.single_flight import SingleFlight
+from  infra.source_registry import SourceRegistry
+from  infra.source_scheduler import SourceScheduler
+from  infra.url_filter import KnownUrlFilter, get_known_filter
 
-def refresh_pipeline(repo: SQLiteRepo) -> Dict[str, float]:
-    items = collect_news(limit_per_source=20)
+def ingest_sources(repo: SQLiteRepo,
+                   sources: Optional[Sequence[Tuple[str, str, str]]],
+                   scheduler: SourceScheduler,
+                   known: KnownUrlFilter,
+                   limit_per_source: int = 20,
+                   deadline: Optional[Deadline] = None,
+                   force: bool = False) -> Tuple[int, List[str]]:
+    """
+    collect -> persist (+ enfileira para scoring) para um conjunto de fontes.
+    Devolve (itens gravados, fontes puladas pelo prazo).
+    """
+    known.refresh()  # urls gravadas por outros processos (workers, outras sessões)
+    items, skipped = collect_news_until(deadline, limit_per_source=limit_per_source,
+                                        scheduler=scheduler, known=known, sources=sources,
+                                        force=force)
     repo.upsert_news(items)
+    for url in items.url:
+        known.add(url)
+    return len(items), skipped
 
-    scores = [score_item(it) for it in items]
-    repo.upsert_scores(scores)
+def score_queued(repo: SQLiteRepo,
+                 worker_id: str,
+                 batch_size: int = 200,
+                 lease_s: float = 300,
+                 max_batches: Optional[int] = None,
+                 monitor: Optional[AnomalyMonitor] = None,
+                 deadline: Optional[Deadline] = None) -> int:
+    """
+    Drena a fila de scoring em lotes: dequeue (lease) -> score -> persist -> ack.
+    Com prazo, para entre lotes; o que sobrar fica na fila para o próximo.
+    """
+    scored = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        if deadline is not None and deadline.expired:
+            break
+        items = repo.dequeue_news(worker_id, limit=batch_size, lease_s=lease_s)
+        if not items:
+            break
+        batches += 1
+        try:
+            # sempre na versão do código: a ativa (leitura) pode ser uma antiga,
+            # congelada até o backfill --activate; misturar lógicas não
+            scores = score_batch(items, *repo.version_spec(SCORING_VERSION))
+            repo.upsert_scores(scores, version=SCORING_VERSION)
+        except Exception as ex:
+            repo.nack_news(worker_id, items.url, repr(ex))
+            print(f"   ❌ scoring de {len(items)} itens: {ex!r}")
+            continue
+        repo.ack_news(worker_id, items.url)
+        scored += len(scores)
 
-    global_risk = repo.fetch_global_risk()
-    minutes = risk_to_minutes(global_risk)
+        # detector online: O(lote) em memória + uma transação; notificação em thread
+        if monitor:
+            try:
+                monitor.observe(items, scores)
+            except Exception as ex:
+                print(f"   ❌ detector de anomalias: {ex!r}")
+    return scored
 
+# parte do prazo reservada para gravar + pontuar o que a coleta trouxe
+SCORING_RESERVE = 0.25
+
+# refresh que terminou há menos disso é reaproveitado por quem chega depois
+REFRESH_REUSE_S = 60.0
+# lease do dono sem prazo definido (com prazo: 2x o prazo + folga)
+REFRESH_LEASE_S = 900.0
+# lease da retenção em segundo plano (arquivo + incremental_vacuum + ANALYZE)
+RETENTION_LEASE_S = 3600.0
+
+def refresh_pipeline(repo: SQLiteRepo,
+                     sources: Optional[Sequence[Tuple[str, str, str]]] = None,
+                     deadline: Optional[float] = None,
+                     reuse_s: float = REFRESH_REUSE_S,
+                     force: bool = False) -> Dict:
+    """
+    collect -> persist -> score. Com `deadline` (segundos), a coleta para em
+    ~75% do prazo e o scoring no prazo; fontes que não responderam a tempo
+    saem em skipped_sources e o que não foi pontuado fica na fila.
+    `force` (refresh manual) coleta as fontes saudáveis mesmo antes do
+    intervalo agendado; backoff e circuito aberto continuam valendo.
+
+    Single-flight entre sessões e processos: se outro refresh das mesmas
+    fontes está rodando (ou terminou há menos de reuse_s), espera por ele e
+    devolve o resultado dele com coalesced=True em vez de coletar de novo.
+    """
+    name = "refresh"
+    if sources is not None:
+        name += ":" + hashlib.sha1(repr(sorted(sources)).encode("utf-8")).hexdigest()[:12]
+    lease_s = 2 * deadline + 30 if deadline is not None else REFRESH_LEASE_S
+
+    result, ran = SingleFlight(repo.db_path).run(
+        name, lambda: _profiled(lambda: _refresh(repo, sources, deadline, force)),
+        lease_s=lease_s, wait_s=deadline if deadline is not None else lease_s, reuse_s=reuse_s,
+    )
+    if result is None:
+        # o outro refresh não terminou dentro do nosso prazo: fica com o snapshot atual
+        snap = load_dashboard_snapshot(repo) or {"global_risk": 0.0, "minutes_to_midnight": 0.0}
+        result = _result(snap, 0, 0, None, repo.queue_depth(), [], True)
+    return dict(result, coalesced=not ran)
+
+def _profiled(run):
+    # opt-in (DOOMSDAY_PROFILE): relatório JSON por refresh, caminho em profile_path
+    mode = profile_mode_from_env()
+    if mode is None:
+        return run()
+    with profiling(mode) as report:
+        result = run()
+    return dict(result, profile_path=write_report(report, f"refresh-{mode}"))
+
+def _retention_in_background(repo: SQLiteRepo, policy: RetentionPolicy) -> None:
+    # uma retenção por vez entre sessões/processos; quem não pega o lock desiste na hora
+    def run():
+        try:
+            SingleFlight(repo.db_path).run(
+                "retention",
+                lambda: {"ran": maybe_run_retention(repo, policy) is not None},
+                lease_s=RETENTION_LEASE_S, wait_s=0,
+            )
+        except Exception as ex:
+            print(f"   ❌ retenção: {ex!r}")
+
+    threading.Thread(target=run, name="retention", daemon=True).start()
+
+def _result(snap: Dict, n_items: int, n_scores: int, retention, queue_depth: int,
+            skipped: List[str], deadline_hit: bool) -> Dict:
     return {
-        "global_risk": global_risk,
-        "minutes_to_midnight": minutes,
-        "items_collected": len(items),
-        "items_scored": len(scores),
-    }
\ No newline at end of file
+        "global_risk": snap["global_risk"],
+        "minutes_to_midnight": snap["minutes_to_midnight"],
+        "items_collected": n_items,
+        "items_scored": n_scores,
+        "items_archived": retention.archived_news if retention else 0,
+        "queue_depth": queue_depth,
+        "skipped_sources": skipped,
+        "deadline_hit": deadline_hit,
+    }
+
+def _refresh(repo: SQLiteRepo,
+             sources: Optional[Sequence[Tuple[str, str, str]]],
+             deadline: Optional[float],
+             force: bool = False) -> Dict:
+    dl = Deadline.after(deadline) if deadline is not None else None
+    scheduler = SourceScheduler(repo.db_path)
+    known = get_known_filter(repo)
+    monitor = AnomalyMonitor(repo.db_path, notifier=AlertNotifier.from_env())
+
+    # com o registro de fontes populado, respeita enabled e os leases dos workers
+    registry = SourceRegistry(repo.db_path)
+    worker_id = f"refresh:{os.getpid()}"
+    claimed: List[str] = []
+    if sources is None and registry.all(enabled_only=False):
+        lease_s = 2 * deadline + 30 if deadline is not None else REFRESH_LEASE_S
+        sources = registry.claim(worker_id, len(registry.all()), lease_s=lease_s, force=force)
+        claimed = [s[0] for s in sources]
+    try:
+        n_items, skipped = ingest_sources(
+            repo, sources, scheduler, known,
+            deadline=dl.reserve(deadline * SCORING_RESERVE) if dl else None,
+            force=force,
+        )
+    finally:
+        if claimed:
+            registry.release(worker_id, claimed)
+    # sem workers de scoring rodando, o próprio refresh drena a fila
+    n_scores = score_queued(repo, worker_id, monitor=monitor, deadline=dl)
+
+    # retenção/compactação agendada (no-op se rodou há pouco). Com prazo, roda
+    # fora dele, numa thread: o tempo dela não tem limite e não cabe na página
+    policy = RetentionPolicy.from_env()
+    if dl is None:
+        retention = maybe_run_retention(repo, policy)
+    else:
+        retention = None
+        if retention_due(repo, policy):
+            _retention_in_background(repo, policy)
+
+    # primeira tela do dashboard pronta para uma leitura só
+    snap = publish_dashboard_snapshot(repo, deadline=dl)
+
+    return _result(snap, n_items, n_scores, retention, repo.queue_depth(),
+                   skipped, bool(skipped) or (dl is not None and dl.expired))
@@ -0,0 +1,84 @@
+import argparse
+import os
+import socket
+import time
+import uuid
+from multiprocessing import Process
+from typing import Dict, Optional
+
+from  application.use_cases import ingest_sources
+from  infra.repository import SQLiteRepo
+from  infra.source_registry import SourceRegistry
+from  infra.source_scheduler import SourceScheduler
+from  infra.url_filter import get_known_filter
+
+def run_worker(db_path: str,
+               worker_id: Optional[str] = None,
+               shard_size: int = 20,
+               lease_s: float = 300,
+               idle_sleep_s: float = 30,
+               limit_per_source: int = 20,
+               max_queue: Optional[int] = None,
+               once: bool = False) -> Dict[str, int]:
+    """
+    Loop de um worker de coleta: aluga um shard de fontes vencidas, coleta,
+    grava (enfileirando para os scorers) e libera. Com `max_queue`, espera
+    enquanto a fila de scoring estiver acima disso (backpressure).
+    `once=True` para quando não houver mais fontes vencidas.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    repo = SQLiteRepo(db_path)
+    registry = SourceRegistry(db_path)
+    scheduler = SourceScheduler(db_path)
+    known = get_known_filter(repo)
+    totals = {"shards": 0, "sources": 0, "items_collected": 0, "throttled": 0}
+
+    while True:
+        if max_queue is not None and repo.queue_depth() > max_queue:
+            totals["throttled"] += 1
+            time.sleep(idle_sleep_s)
+            continue
+        shard = registry.claim(worker_id, shard_size, lease_s=lease_s)
+        if not shard:
+            if once:
+                return totals
+            time.sleep(idle_sleep_s)
+            continue
+        try:
+            collected, _ = ingest_sources(repo, shard, scheduler, known,
+                                          limit_per_source=limit_per_source)
+        finally:
+            registry.release(worker_id, [s[0] for s in shard])
+        totals["shards"] += 1
+        totals["sources"] += len(shard)
+        totals["items_collected"] += collected
+
+def _run(db_path: str, kwargs: dict) -> None:
+    print(run_worker(db_path, **kwargs))
+
+if __name__ == "__main__":
+    # python -m application.worker --db ../data/doomsday.db --processes 4 --sync   (a partir de src/)
+    # (o scoring fica com python -m application.scorer)
+    parser = argparse.ArgumentParser(description="Workers de coleta com shards via lease no SQLite.")
+    parser.add_argument("--db", default=os.path.join("data", "doomsday.db"))
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--shard-size", type=int, default=20)
+    parser.add_argument("--lease-s", type=float, default=300)
+    parser.add_argument("--idle-sleep-s", type=float, default=30)
+    parser.add_argument("--max-queue", type=int, default=None,
+                        help="pausa a coleta com mais que isso na fila de scoring")
+    parser.add_argument("--once", action="store_true", help="sai quando não houver fontes vencidas")
+    parser.add_argument("--sync", action="store_true", help="importa RSS_SOURCES/DOOMSDAY_SOURCES antes")
+    args = parser.parse_args()
+
+    SQLiteRepo(args.db)  # schema/migrações uma vez, antes de abrir os processos
+    if args.sync:
+        print(f"{SourceRegistry(args.db).sync()} fontes sincronizadas")
+
+    opts = {"shard_size": args.shard_size, "lease_s": args.lease_s,
+            "idle_sleep_s": args.idle_sleep_s, "max_queue": args.max_queue, "once": args.once}
+    procs = [Process(target=_run, args=(args.db, opts)) for _ in range(args.processes)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+GLOBAL_KEY = "global"
+
+def category_key(category: str) -> str:
+    return f"category:{category}"
+
+@dataclass(frozen=True)
+class DetectorConfig:
+    alpha: float = 0.05          # EWMA: peso de cada observação nova na linha de base
+    k: float = 0.5               # folga do CUSUM, em desvios-padrão
+    h: float = 5.0               # limiar do CUSUM para disparar
+    warmup: int = 30             # observações antes de poder alertar
+    min_std: float = 0.05        # piso do desvio (série estável não vira z enorme)
+    cooldown_s: float = 3600.0   # no máximo um alerta por chave nesse intervalo
+
+@dataclass(frozen=True, slots=True)
+class DetectorState:
+    key: str
+    n: int = 0
+    mean: float = 0.0
+    var: float = 0.0
+    cusum: float = 0.0
+    updated_ts: float = 0.0
+    last_alert_ts: float = 0.0
+
+@dataclass(frozen=True, slots=True)
+class AnomalyEvent:
+    key: str
+    ts: float
+    value: float      # score que cruzou o limiar
+    baseline: float   # média EWMA antes dele
+    std: float
+    cusum: float
+
+    @property
+    def message(self) -> str:
+        return (f"{self.key}: risco acima da linha de base "
+                f"({self.value:.2f} vs {self.baseline:.2f} ± {self.std:.2f}, CUSUM {self.cusum:.1f})")
+
+def observe(st: DetectorState, x: float, ts: float,
+            cfg: DetectorConfig = DetectorConfig(),
+            now: Optional[float] = None) -> Tuple[DetectorState, Optional[AnomalyEvent]]:
+    """
+    Um passo O(1): CUSUM unilateral (só altas) sobre o z-score contra a
+    média/variância EWMA, que então absorve a observação.
+    O cooldown conta no relógio de parede (`now`, padrão: ts): itens de um
+    backlog antigo não podem furá-lo por terem datas de publicação espaçadas.
+    """
+    now = ts if now is None else now
+    if st.n == 0:
+        return DetectorState(st.key, 1, x, 0.0, 0.0, ts, st.last_alert_ts), None
+
+    std = max(math.sqrt(st.var), cfg.min_std)
+    cusum = max(0.0, st.cusum + (x - st.mean) / std - cfg.k)
+
+    event = None
+    last_alert = st.last_alert_ts
+    if cusum > cfg.h and st.n >= cfg.warmup:
+        if now - last_alert >= cfg.cooldown_s:
+            event = AnomalyEvent(st.key, ts, x, st.mean, std, cusum)
+            last_alert = now
+        cusum = 0.0  # recomeça a acumular (com ou sem alerta emitido)
+
+    # média/variância exponencialmente ponderadas (forma incremental)
+    diff = x - st.mean
+    incr = cfg.alpha * diff
+    mean = st.mean + incr
+    var = (1.0 - cfg.alpha) * (st.var + diff * incr)
+    return DetectorState(st.key, st.n + 1, mean, var, cusum, ts, last_alert), event
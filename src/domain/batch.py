@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Tuple
+
+from .models import LABELS, NewsItem, ThreatScore
+
+# labels guardados como índice em LABELS (1 byte por item)
+_LABEL_INDEX = {l: i for i, l in enumerate(LABELS)}
+
+def to_epoch(dt: datetime) -> float:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+def _dt(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+@dataclass
+class NewsBatch:
+    """
+    Lote colunar de notícias: uma lista por campo de texto, array('d') para
+    as datas e strings repetidas (fonte/categoria/região) internadas.
+    Iterar devolve NewsItem, então o lote serve onde antes ia uma lista.
+    """
+    source: List[str] = field(default_factory=list)
+    title: List[str] = field(default_factory=list)
+    summary: List[str] = field(default_factory=list)
+    url: List[str] = field(default_factory=list)
+    published_ts: array = field(default_factory=lambda: array("d"))
+    category: List[str] = field(default_factory=list)
+    region: List[str] = field(default_factory=list)
+
+    def append(self, source: str, title: str, summary: str, url: str,
+               published_ts: float, category: str = "Geral", region: str = "Global") -> None:
+        self.source.append(sys.intern(source))
+        self.title.append(title)
+        self.summary.append(summary)
+        self.url.append(url)
+        self.published_ts.append(published_ts)
+        self.category.append(sys.intern(category))
+        self.region.append(sys.intern(region))
+
+    def append_item(self, it: NewsItem) -> None:
+        self.append(it.source, it.title, it.summary, it.url,
+                    to_epoch(it.published_at), it.category, it.region)
+
+    @classmethod
+    def from_items(cls, items: Iterable[NewsItem]) -> "NewsBatch":
+        if isinstance(items, NewsBatch):
+            return items
+        b = cls()
+        for it in items:
+            b.append_item(it)
+        return b
+
+    def __len__(self) -> int:
+        return len(self.url)
+
+    def __getitem__(self, i: int) -> NewsItem:
+        return NewsItem(
+            source=self.source[i], title=self.title[i], summary=self.summary[i],
+            url=self.url[i], published_at=_dt(self.published_ts[i]),
+            category=self.category[i], region=self.region[i],
+        )
+
+    def __iter__(self) -> Iterator[NewsItem]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def db_rows(self) -> Iterator[Tuple]:
+        """Linhas para news(url, source, title, summary, category, published_at, region)."""
+        for i in range(len(self)):
+            if self.url[i]:
+                yield (self.url[i], self.source[i], self.title[i], self.summary[i],
+                       self.category[i], _dt(self.published_ts[i]).isoformat(), self.region[i])
+
+@dataclass
+class ScoreBatch:
+    """Lote colunar de scores: componentes em array('d'), label em array('B')."""
+    url: List[str] = field(default_factory=list)
+    sentiment: array = field(default_factory=lambda: array("d"))
+    keywords: array = field(default_factory=lambda: array("d"))
+    source_weight: array = field(default_factory=lambda: array("d"))
+    recency: array = field(default_factory=lambda: array("d"))
+    final: array = field(default_factory=lambda: array("d"))
+    label: array = field(default_factory=lambda: array("B"))
+    published_ts: array = field(default_factory=lambda: array("d"))
+
+    def append(self, url: str, sentiment: float, keywords: float, source_weight: float,
+               recency: float, final: float, label: str, published_ts: float) -> None:
+        self.url.append(url)
+        self.sentiment.append(sentiment)
+        self.keywords.append(keywords)
+        self.source_weight.append(source_weight)
+        self.recency.append(recency)
+        self.final.append(final)
+        self.label.append(_LABEL_INDEX[label])
+        self.published_ts.append(published_ts)
+
+    @classmethod
+    def from_scores(cls, scores: Iterable[ThreatScore]) -> "ScoreBatch":
+        if isinstance(scores, ScoreBatch):
+            return scores
+        b = cls()
+        for sc in scores:
+            b.append(sc.item_url, sc.sentiment, sc.keywords, sc.source_weight,
+                     sc.recency, sc.final, sc.label, sc.published_ts)
+        return b
+
+    def __len__(self) -> int:
+        return len(self.url)
+
+    def __getitem__(self, i: int) -> ThreatScore:
+        return ThreatScore(
+            item_url=self.url[i], sentiment=self.sentiment[i], keywords=self.keywords[i],
+            source_weight=self.source_weight[i], recency=self.recency[i],
+            final=self.final[i], label=LABELS[self.label[i]], published_ts=self.published_ts[i],
+        )
+
+    def __iter__(self) -> Iterator[ThreatScore]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def db_rows(self, version: str, calculated_at: str) -> Iterator[Tuple]:
+        """Linhas para scores(url, version, ..., calculated_at, published_ts)."""
+        for i in range(len(self)):
+            yield (self.url[i], version, self.sentiment[i], self.keywords[i],
+                   self.source_weight[i], self.recency[i], self.final[i],
+                   LABELS[self.label[i]], calculated_at, self.published_ts[i])
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+# ---------------------------
+# Detecção de idioma (em processo, sem rede)
+# ---------------------------
+LANGUAGES = ("en", "pt", "es", "ru")
+DEFAULT_LANGUAGE = "en"
+
+_STOPWORDS: Dict[str, frozenset] = {
+    "en": frozenset("the and of to in is for on with that as at by from after over says".split()),
+    "pt": frozenset("de da do das dos que em para com não o e um uma os por mais ao à na no "
+                    "é são foi após pelo pela sobre entre".split()),
+    "es": frozenset("el la los las del que en para con un una por más al lo se es y tras "
+                    "según sobre entre".split()),
+}
+
+_WORD = re.compile(r"\w+")
+_CYRILLIC = re.compile(r"[Ѐ-ӿ]")
+
+def detect_language(text: str) -> str:
+    """
+    Heurística barata: escrita cirílica -> ru; senão, idioma com mais
+    stopwords no texto (empate/nenhuma -> en).
+    """
+    if not text:
+        return DEFAULT_LANGUAGE
+    letters = sum(1 for c in text if c.isalpha())
+    if letters and len(_CYRILLIC.findall(text)) / letters > 0.3:
+        return "ru"
+    tokens = _WORD.findall(text.lower())
+    best, best_hits = DEFAULT_LANGUAGE, 0
+    for lang, stop in _STOPWORDS.items():
+        hits = sum(1 for t in tokens if t in stop)
+        if hits > best_hits:
+            best, best_hits = lang, hits
+    return best
+
+# ---------------------------
+# Léxicos de palavras-chave: termo -> chave canônica (inglês) de DEFAULT_KEYWORDS.
+# O peso continua vindo do dicionário de keywords do scoring.
+# Termos terminados em "*" casam como prefixo (flexões: guerras, ядерный...).
+# ---------------------------
+KEYWORD_LEXICONS: Dict[str, Dict[str, str]] = {
+    "en": {
+        "nuclear": "nuclear", "war": "war", "wars": "war", "warfare": "war",
+        "missile*": "missile", "radiation": "radiation", "atomic": "atomic",
+        "world war": "world war", "outbreak*": "outbreak", "pandemic*": "pandemic",
+        "ai arms race": "ai arms race", "climate tipping point*": "climate tipping point",
+        "catastroph*": "catastrophe", "collapse*": "collapse", "genocid*": "genocide",
+        "terror*": "terror",
+    },
+    "pt": {
+        "nuclear*": "nuclear", "guerra*": "war", "míssil": "missile", "mísseis": "missile",
+        "radiação": "radiation", "radioativ*": "radiation", "atômic*": "atomic",
+        "guerra mundial": "world war", "surto*": "outbreak", "pandemia*": "pandemic",
+        "corrida armamentista de ia": "ai arms race",
+        "ponto de não retorno climático": "climate tipping point",
+        "catástrofe*": "catastrophe", "catastrófic*": "catastrophe", "colapso*": "collapse",
+        "genocídio*": "genocide", "terror*": "terror",
+        # termos do analysis.py (PALAVRAS_CHAVE)
+        "otan": "nato", "ameaça*": "threat", "escalada": "escalation", "militar*": "military",
+    },
+    "es": {
+        "nuclear*": "nuclear", "guerra*": "war", "misil*": "missile", "mísil*": "missile",
+        "radiación": "radiation", "radiactiv*": "radiation", "atómic*": "atomic",
+        "guerra mundial": "world war", "brote": "outbreak", "brotes": "outbreak",
+        "pandemia*": "pandemic", "carrera armamentista de ia": "ai arms race",
+        "punto de no retorno climático": "climate tipping point",
+        "catástrofe*": "catastrophe", "catastrófic*": "catastrophe", "colapso*": "collapse",
+        "genocidio*": "genocide", "terror*": "terror",
+        "otan": "nato", "amenaza*": "threat", "escalada": "escalation", "militar*": "military",
+    },
+    "ru": {
+        "ядерн*": "nuclear", "войн*": "war", "ракет*": "missile", "радиац*": "radiation",
+        "радиоактивн*": "radiation", "атомн*": "atomic", "мировая война": "world war",
+        "мировой войн*": "world war", "вспышк*": "outbreak", "пандеми*": "pandemic",
+        "катастроф*": "catastrophe", "коллапс*": "collapse", "геноцид*": "genocide",
+        "террор*": "terror", "теракт*": "terror",
+        "нато": "nato", "угроз*": "threat", "эскалаци*": "escalation", "военн*": "military",
+        "путин*": "putin", "трамп*": "trump", "китай*": "china",
+    },
+}
+
+# termo -> categoria (mesmos nomes de CATEGORIES no scoring)
+CATEGORY_LEXICONS: Dict[str, Dict[str, Sequence[str]]] = {
+    "en": {
+        "Nuclear": ["nuclear", "atomic", "radiation"],
+        "Guerra": ["war", "wars", "missile*", "invasion", "strike*"],
+        "Clima": ["climate", "tipping point", "wildfire*", "flood*"],
+        "Pandemia": ["pandemic*", "outbreak*", "virus*"],
+        "IA": ["ai", "arms race", "autonomous weapons"],
+    },
+    "pt": {
+        "Nuclear": ["nuclear*", "atômic*", "radiação", "radioativ*"],
+        "Guerra": ["guerra*", "míssil", "mísseis", "invasão", "ataque*", "bombardeio*"],
+        "Clima": ["clima*", "aquecimento global", "incêndio*", "enchente*", "inundaç*"],
+        "Pandemia": ["pandemia*", "surto*", "vírus"],
+        "IA": ["ia", "inteligência artificial", "armas autônomas"],
+    },
+    "es": {
+        "Nuclear": ["nuclear*", "atómic*", "radiación", "radiactiv*"],
+        "Guerra": ["guerra*", "misil*", "invasión", "ataque*", "bombardeo*"],
+        "Clima": ["clima*", "calentamiento global", "incendio*", "inundaci*"],
+        "Pandemia": ["pandemia*", "brote", "brotes", "virus"],
+        "IA": ["ia", "inteligencia artificial", "armas autónomas"],
+    },
+    "ru": {
+        "Nuclear": ["ядерн*", "атомн*", "радиац*", "радиоактивн*"],
+        "Guerra": ["войн*", "ракет*", "вторжени*", "удар*", "обстрел*"],
+        "Clima": ["климат*", "глобальное потепление", "пожар*", "наводнени*"],
+        "Pandemia": ["пандеми*", "вспышк*", "вирус*"],
+        "IA": ["ии", "искусственн* интеллект*", "автономное оружие"],
+    },
+}
+
+# valências no padrão VADER (-4..4), somadas ao léxico inglês no analisador do idioma
+SENTIMENT_LEXICONS: Dict[str, Dict[str, float]] = {
+    "pt": {
+        "guerra": -2.9, "guerras": -2.9, "morte": -2.9, "mortes": -2.9, "mortos": -3.3,
+        "morreu": -2.6, "morreram": -2.6, "ataque": -2.1, "ataques": -2.1, "bomba": -2.2,
+        "bombas": -2.2, "crise": -3.1, "ameaça": -2.4, "ameaças": -2.4, "violência": -3.1,
+        "conflito": -1.3, "terror": -3.4, "medo": -2.2, "desastre": -3.1, "tragédia": -3.4,
+        "feridos": -1.7, "vítimas": -2.7, "catástrofe": -3.4, "destruição": -2.7,
+        "paz": 2.5, "acordo": 2.2, "ajuda": 1.7, "vitória": 2.8, "esperança": 1.9,
+        "segurança": 1.4,
+    },
+    "es": {
+        "guerra": -2.9, "guerras": -2.9, "muerte": -2.9, "muertes": -2.9, "muertos": -3.3,
+        "murió": -2.6, "murieron": -2.6, "ataque": -2.1, "ataques": -2.1, "bomba": -2.2,
+        "bombas": -2.2, "crisis": -3.1, "amenaza": -2.4, "amenazas": -2.4, "violencia": -3.1,
+        "conflicto": -1.3, "terror": -3.4, "miedo": -2.2, "desastre": -3.1, "tragedia": -3.4,
+        "heridos": -1.7, "víctimas": -2.7, "catástrofe": -3.4, "destrucción": -2.7,
+        "paz": 2.5, "acuerdo": 2.2, "ayuda": 1.7, "victoria": 2.8, "esperanza": 1.9,
+        "seguridad": 1.4,
+    },
+    "ru": {
+        "война": -2.9, "войны": -2.9, "войне": -2.9, "войну": -2.9, "смерть": -2.9,
+        "смерти": -2.9, "погибли": -3.3, "погиб": -3.3, "убиты": -3.5, "убит": -3.5,
+        "атака": -2.1, "атаки": -2.1, "бомба": -2.2, "бомбы": -2.2, "кризис": -3.1,
+        "угроза": -2.4, "угрозы": -2.4, "насилие": -3.1, "конфликт": -1.3, "террор": -3.4,
+        "страх": -2.2, "катастрофа": -3.4, "трагедия": -3.4, "жертвы": -2.7,
+        "разрушения": -2.7, "перемирие": 1.9, "соглашение": 2.2, "помощь": 1.7,
+        "победа": 2.8, "надежда": 1.9, "безопасность": 1.4,
+    },
+}
+
+# ---------------------------
+# Matcher: um único regex por idioma, todos os termos em alternância
+# ---------------------------
+def _term_pattern(term: str) -> str:
+    return re.escape(term).replace(r"\*", r"\w*")
+
+class TermMatcher:
+    """
+    Compila termos -> rótulo num só regex (limites de palavra, termos mais
+    longos primeiro). `labels(text)` devolve o rótulo de cada termo distinto
+    encontrado, numa única varredura do texto.
+    """
+
+    def __init__(self, terms: Mapping[str, str]):
+        ordered = sorted(terms.items(), key=lambda kv: len(kv[0].rstrip("*")), reverse=True)
+        self._labels: List[str] = [label for _, label in ordered]
+        alternation = "|".join(f"(?P<t{i}>{_term_pattern(t)})" for i, (t, _) in enumerate(ordered))
+        self._regex = re.compile(rf"(?<!\w)(?:{alternation})(?!\w)") if ordered else None
+
+    def labels(self, text: str) -> List[str]:
+        if self._regex is None:
+            return []
+        seen = set()
+        out = []
+        for m in self._regex.finditer(text.lower()):
+            i = int(m.lastgroup[1:])
+            if i not in seen:
+                seen.add(i)
+                out.append(self._labels[i])
+        return out
+
+def keyword_terms(keywords: Mapping[str, float], lang: str) -> Dict[str, str]:
+    """
+    Termos do idioma (+ inglês, comum em manchetes) cujas chaves canônicas
+    existem em `keywords`; chaves sem tradução entram como o próprio termo.
+    """
+    terms: Dict[str, str] = {k: k for k in keywords}
+    for lex_lang in dict.fromkeys((DEFAULT_LANGUAGE, lang)):
+        for term, key in KEYWORD_LEXICONS.get(lex_lang, {}).items():
+            if key in keywords:
+                terms[term] = key
+    return terms
+
+def category_terms(categories: Mapping[str, Sequence[str]], lang: str) -> Dict[str, str]:
+    terms: Dict[str, str] = {}
+    for cat, keys in categories.items():
+        for k in keys:
+            terms[k] = cat
+    for lex_lang in dict.fromkeys((DEFAULT_LANGUAGE, lang)):
+        for cat, keys in CATEGORY_LEXICONS.get(lex_lang, {}).items():
+            if cat in categories:
+                for k in keys:
+                    terms[k] = cat
+    return terms
+
+_matchers: Dict[Tuple[int, str], Tuple[object, TermMatcher]] = {}
+
+def matcher_for(table: Mapping, lang: str, build=keyword_terms) -> TermMatcher:
+    """
+    Matcher compilado uma vez por (tabela, idioma). A tabela (ex.:
+    DEFAULT_KEYWORDS) fica referenciada no cache, então o id não é reutilizado.
+    """
+    key = (id(table), lang)
+    hit = _matchers.get(key)
+    if hit is None or hit[0] is not table:
+        hit = (table, TermMatcher(build(table, lang)))
+        _matchers[key] = hit
+    return hit[1]
+
+def sentiment_lexicon(lang: str) -> Optional[Dict[str, float]]:
+    return SENTIMENT_LEXICONS.get(lang)
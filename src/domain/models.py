@@ -2,7 +2,8 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
-@dataclass(frozen=True)
+# slots=True: sem __dict__ por instância (lotes grandes ficam bem menores)
+@dataclass(frozen=True, slots=True)
 class NewsItem:
     source: str
     title: str
@@ -10,8 +11,11 @@ class NewsItem:
     url: str
     published_at: datetime
     category: str = "Geral"
+    region: str = "Global"
 
-@dataclass(frozen=True)
+LABELS = ("Baixo", "Médio", "Alto", "Crítico")
+
+@dataclass(frozen=True, slots=True)
 class ThreatScore:
     item_url: str
     sentiment: float          # 0..1
@@ -19,4 +23,5 @@ class ThreatScore:
     source_weight: float      # 0..1
     recency: float            # 0..1
     final: float              # 0..1
-    label: str                # "Baixo", "Médio", "Alto", "Crítico"
\ No newline at end of file
+    label: str                # "Baixo", "Médio", "Alto", "Crítico"
+    published_ts: float = 0.0 # epoch UTC da publicação (decay na leitura)
\ No newline at end of file
@@ -1,12 +1,30 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
-from .models import NewsItem, ThreatScore
+from .batch import NewsBatch, ScoreBatch, to_epoch
+from .lexicons import (DEFAULT_LANGUAGE, category_terms, detect_language, matcher_for,
+                       sentiment_lexicon)
+from .models import LABELS, NewsItem, ThreatScore
 
 _analyzer = SentimentIntensityAnalyzer()
+_analyzers: Dict[str, SentimentIntensityAnalyzer] = {DEFAULT_LANGUAGE: _analyzer}
+
+def _analyzer_for(lang: str) -> SentimentIntensityAnalyzer:
+    # VADER do idioma: léxico inglês + valências locais (sem tradução)
+    a = _analyzers.get(lang)
+    if a is None:
+        extra = sentiment_lexicon(lang)
+        if extra is None:
+            return _analyzer
+        a = SentimentIntensityAnalyzer()
+        a.lexicon.update(extra)
+        _analyzers[lang] = a
+    return a
 
 DEFAULT_KEYWORDS: Dict[str, float] = {
     # weights 0..1 (quanto mais “existencial”, maior)
@@ -43,31 +61,30 @@ CATEGORIES = {
     "IA": ["ai", "arms race", "autonomous weapons"],
 }
 
-def infer_category(text: str) -> str:
-    t = text.lower()
+def infer_category(text: str, lang: Optional[str] = None) -> str:
+    lang = lang or detect_language(text)
+    hits: Dict[str, int] = {}
+    for cat in matcher_for(CATEGORIES, lang, build=category_terms).labels(text):
+        hits[cat] = hits.get(cat, 0) + 1
     best = ("Geral", 0)
-    for cat, keys in CATEGORIES.items():
-        hits = sum(1 for k in keys if k in t)
-        if hits > best[1]:
-            best = (cat, hits)
+    for cat in CATEGORIES:
+        if hits.get(cat, 0) > best[1]:
+            best = (cat, hits[cat])
     return best[0]
 
 def clamp01(x: float) -> float:
     return max(0.0, min(1.0, x))
 
-def sentiment_score(text: str) -> float:
+def sentiment_score(text: str, lang: str = DEFAULT_LANGUAGE) -> float:
     # VADER compound: -1..1 (negativo = pior)
-    c = _analyzer.polarity_scores(text)["compound"]
+    c = _analyzer_for(lang).polarity_scores(text)["compound"]
     # mapeia: -1..1 -> 0..1, mas invertendo (negativo = alto risco)
     risk = (1 - (c + 1) / 2)  # c=-1 => 1, c=+1 => 0
     return clamp01(risk)
 
-def keyword_score(text: str, keywords: Dict[str, float]) -> float:
-    t = text.lower()
-    hits: List[float] = []
-    for k, w in keywords.items():
-        if k in t:
-            hits.append(w)
+def keyword_score(text: str, keywords: Dict[str, float], lang: str = DEFAULT_LANGUAGE) -> float:
+    # um regex por idioma; termos traduzidos valem o peso da chave canônica
+    hits: List[float] = [keywords[k] for k in dict.fromkeys(matcher_for(keywords, lang).labels(text))]
     if not hits:
         return 0.0
     # saturação suave: média + bônus por múltiplos termos
@@ -79,23 +96,26 @@ def source_weight(source: str, weights: Dict[str, float]) -> float:
     # default conservador
     return clamp01(weights.get(source, 0.75))
 
-def recency_score(published_at: datetime) -> float:
+RECENCY_HALF_LIFE_HOURS = 36.0
+RECENCY_FLOOR = 0.10
+
+def recency_decay(age_hours: float) -> float:
+    """
+    Decaimento contínuo da recência (0..1).
+    Meia-vida de RECENCY_HALF_LIFE_HOURS, nunca abaixo de RECENCY_FLOOR.
+    Usado tanto no score_item quanto na leitura (SQL) do risco global.
+    """
+    age_hours = max(0.0, age_hours)
+    return RECENCY_FLOOR + (1.0 - RECENCY_FLOOR) * 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+
+def recency_score(published_at: datetime, now: Optional[datetime] = None) -> float:
     # Quanto mais recente, maior o peso (0..1)
-    now = datetime.now(timezone.utc)
-    if published_at.tzinfo is None:
-        published_at = published_at.replace(tzinfo=timezone.utc)
-    age_hours = (now - published_at).total_seconds() / 3600.0
-
-    # 0h => 1.0
-    # 72h => ~0.2
-    # >7 dias => ~0.05
-    if age_hours <= 24:
-        return 1.0
-    if age_hours <= 72:
-        return 0.6
-    if age_hours <= 168:
-        return 0.35
-    return 0.10
+    # 0h => 1.0 | 36h => 0.55 | 72h => ~0.33 | 7 dias => ~0.13
+    now = now or datetime.now(timezone.utc)
+    age_hours = (to_epoch(now) - to_epoch(published_at)) / 3600.0
+    return recency_decay(age_hours)
+
+LABEL_THRESHOLDS = (0.25, 0.50, 0.75)
 
 def label_from(score: float) -> str:
     if score < 0.25: return "Baixo"
@@ -103,6 +123,11 @@ def label_from(score: float) -> str:
     if score < 0.75: return "Alto"
     return "Crítico"
 
+# nome do conjunto de scores gravado pelo pipeline; troque ao mudar
+# DEFAULT_KEYWORDS / DEFAULT_SOURCE_WEIGHTS / ScoringConfig / léxicos e rode o backfill
+# v2: léxicos multilíngues (pt/es/ru) + casamento por palavra inteira
+SCORING_VERSION = "v2"
+
 @dataclass(frozen=True)
 class ScoringConfig:
     w_sentiment: float = 0.35
@@ -110,24 +135,33 @@ class ScoringConfig:
     w_source: float = 0.15
     w_recency: float = 0.10
 
-def score_item(item: NewsItem,
-               cfg: ScoringConfig = ScoringConfig(),
-               keywords: Dict[str, float] = DEFAULT_KEYWORDS,
-               sources: Dict[str, float] = DEFAULT_SOURCE_WEIGHTS) -> ThreatScore:
-
-    text = f"{item.title}\n{item.summary}"
+def score_parts(text: str, source: str, recency: float,
+                cfg: ScoringConfig = ScoringConfig(),
+                keywords: Dict[str, float] = DEFAULT_KEYWORDS,
+                sources: Dict[str, float] = DEFAULT_SOURCE_WEIGHTS) -> Tuple[float, float, float, float, str]:
+    """(sentiment, keywords, source_weight, final, label): a combinação comum a score_item e score_batch."""
+    lang = detect_language(text)
 
-    s = sentiment_score(text)
-    k = keyword_score(text, keywords)
-    sw = source_weight(item.source, sources)
-    r = recency_score(item.published_at)
+    s = sentiment_score(text, lang)
+    k = keyword_score(text, keywords, lang)
+    sw = source_weight(source, sources)
 
     final = clamp01(
         s * cfg.w_sentiment +
         k * cfg.w_keywords +
         sw * cfg.w_source +
-        r * cfg.w_recency
+        recency * cfg.w_recency
     )
+    return s, k, sw, final, label_from(final)
+
+def score_item(item: NewsItem,
+               cfg: ScoringConfig = ScoringConfig(),
+               keywords: Dict[str, float] = DEFAULT_KEYWORDS,
+               sources: Dict[str, float] = DEFAULT_SOURCE_WEIGHTS) -> ThreatScore:
+
+    r = recency_score(item.published_at)
+    s, k, sw, final, label = score_parts(f"{item.title}\n{item.summary}", item.source, r,
+                                         cfg, keywords, sources)
 
     return ThreatScore(
         item_url=item.url,
@@ -136,9 +170,25 @@ def score_item(item: NewsItem,
         source_weight=sw,
         recency=r,
         final=final,
-        label=label_from(final),
+        label=label,
+        published_ts=to_epoch(item.published_at),
     )
 
+def score_batch(batch: NewsBatch,
+                cfg: ScoringConfig = ScoringConfig(),
+                keywords: Dict[str, float] = DEFAULT_KEYWORDS,
+                sources: Dict[str, float] = DEFAULT_SOURCE_WEIGHTS) -> ScoreBatch:
+    """score_item em lote: escreve direto nas colunas, sem um ThreatScore por item."""
+    out = ScoreBatch()
+    now = to_epoch(datetime.now(timezone.utc))
+    for i in range(len(batch)):
+        pub = batch.published_ts[i]
+        r = recency_decay((now - pub) / 3600.0)
+        s, k, sw, final, label = score_parts(f"{batch.title[i]}\n{batch.summary[i]}", batch.source[i], r,
+                                             cfg, keywords, sources)
+        out.append(batch.url[i], s, k, sw, r, final, label, pub)
+    return out
+
 def risk_to_minutes(risk: float) -> float:
     """
     Converte risco 0..1 em minutos 12..1.
@@ -154,4 +204,19 @@ def risk_to_minutes(risk: float) -> float:
     # - risco alto -> desce, mas sem "morrer" em 0.1
     minutes = max_minutes - (risk ** 1.6) * (max_minutes - min_minutes)
 
-    return round(max(min_minutes, minutes), 2)
\ No newline at end of file
+    return round(max(min_minutes, minutes), 2)
+
+# ---------------------------
+# Versões vetorizadas (what-if sobre componentes já gravados)
+# ---------------------------
+# colunas da matriz de componentes: sentiment, keywords, source_weight, recency
+def weights_vector(cfg: ScoringConfig) -> np.ndarray:
+    return np.array([cfg.w_sentiment, cfg.w_keywords, cfg.w_source, cfg.w_recency])
+
+def reweight(components: np.ndarray, cfg: ScoringConfig) -> np.ndarray:
+    """final (0..1) de todos os itens num único produto matriz-vetor."""
+    return np.clip(components @ weights_vector(cfg), 0.0, 1.0)
+
+def labels_from(finals: np.ndarray) -> np.ndarray:
+    """Mesmos cortes do label_from, devolvendo índices em LABELS."""
+    return np.searchsorted(LABEL_THRESHOLDS, finals, side="right")
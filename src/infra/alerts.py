@@ -0,0 +1,168 @@
+# src/infra/alerts.py
+from __future__ import annotations
+
+import json
+import os
+import shlex
+import sqlite3
+import subprocess
+import threading
+import time
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional, Sequence
+
+from domain.anomaly import (GLOBAL_KEY, AnomalyEvent, DetectorConfig, DetectorState,
+                            category_key, observe)
+from domain.batch import NewsBatch, ScoreBatch
+from infra.http_client import get_client
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS anomaly_state (
+  key TEXT PRIMARY KEY,
+  n INTEGER NOT NULL,
+  mean REAL NOT NULL,
+  var REAL NOT NULL,
+  cusum REAL NOT NULL,
+  updated_ts REAL NOT NULL,
+  last_alert_ts REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS alerts (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  created_at REAL NOT NULL,
+  key TEXT NOT NULL,
+  value REAL NOT NULL,
+  baseline REAL NOT NULL,
+  std REAL NOT NULL,
+  cusum REAL NOT NULL,
+  message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_created ON alerts(created_at);
+"""
+
+Notifier = Callable[[List[AnomalyEvent]], None]
+
+class AlertNotifier:
+    """
+    Entrega alertas fora do caminho de refresh (thread daemon):
+    POST JSON num webhook local e/ou um comando que recebe o JSON no stdin.
+    """
+
+    def __init__(self, webhook: Optional[str] = None, command: Optional[str] = None,
+                 timeout: float = 10.0):
+        self.webhook = webhook
+        self.command = command
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls) -> Optional["AlertNotifier"]:
+        webhook = os.getenv("DOOMSDAY_ALERT_WEBHOOK") or None
+        command = os.getenv("DOOMSDAY_ALERT_COMMAND") or None
+        return cls(webhook, command) if webhook or command else None
+
+    def __call__(self, events: List[AnomalyEvent]) -> None:
+        threading.Thread(target=self._deliver, args=(events,), daemon=True).start()
+
+    def _deliver(self, events: List[AnomalyEvent]) -> None:
+        payload = json.dumps(
+            [dict(asdict(e), message=e.message) for e in events], ensure_ascii=False
+        ).encode("utf-8")
+        if self.webhook:
+            try:
+                get_client().session.post(
+                    self.webhook, data=payload, timeout=self.timeout,
+                    headers={"Content-Type": "application/json"},
+                )
+            except Exception as ex:
+                print(f"   ❌ webhook de alerta: {ex!r}")
+        if self.command:
+            try:
+                subprocess.run(shlex.split(self.command), input=payload,
+                               timeout=self.timeout, check=False)
+            except Exception as ex:
+                print(f"   ❌ comando de alerta: {ex!r}")
+
+class AnomalyMonitor:
+    """
+    Detector online (EWMA + CUSUM) por categoria e global, alimentado com cada
+    lote de scores gravado. Estado e alertas no SQLite: vários workers
+    compartilham a mesma linha de base.
+    """
+
+    def __init__(self, db_path: str, cfg: DetectorConfig = DetectorConfig(),
+                 notifier: Optional[Notifier] = None):
+        self.db_path = db_path
+        self.cfg = cfg
+        self.notifier = notifier
+        with self._conn() as con:
+            con.executescript(SCHEMA)
+
+    def _conn(self):
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    @staticmethod
+    def _load(con, keys: Sequence[str]) -> Dict[str, DetectorState]:
+        states = {k: DetectorState(k) for k in keys}
+        cur = con.execute(
+            f"""SELECT key, n, mean, var, cusum, updated_ts, last_alert_ts
+                FROM anomaly_state WHERE key IN ({",".join("?" * len(keys))})""",
+            list(keys)
+        )
+        for r in cur:
+            states[r[0]] = DetectorState(*r)
+        return states
+
+    def observe(self, items: NewsBatch, scores: ScoreBatch) -> List[AnomalyEvent]:
+        """
+        Alimenta o detector com um lote (scores alinhados a items, como sai de
+        score_batch). Custo O(lote) + uma transação curta.
+        """
+        if not len(scores):
+            return []
+        order = sorted(range(len(scores)), key=scores.published_ts.__getitem__)
+        keys = {GLOBAL_KEY} | {category_key(items.category[i]) for i in order}
+
+        events: List[AnomalyEvent] = []
+        now = time.time()  # cooldown no relógio de parede, não na data do item
+        con = self._conn()
+        try:
+            con.execute("BEGIN IMMEDIATE")  # load -> update -> save atômico entre workers
+            states = self._load(con, sorted(keys))
+            for i in order:
+                x, ts = scores.final[i], scores.published_ts[i]
+                for key in (GLOBAL_KEY, category_key(items.category[i])):
+                    states[key], ev = observe(states[key], x, ts, self.cfg, now)
+                    if ev:
+                        events.append(ev)
+            con.executemany(
+                """INSERT OR REPLACE INTO anomaly_state(key, n, mean, var, cusum,
+                       updated_ts, last_alert_ts) VALUES(?,?,?,?,?,?,?)""",
+                [(s.key, s.n, s.mean, s.var, s.cusum, s.updated_ts, s.last_alert_ts)
+                 for s in states.values()]
+            )
+            con.executemany(
+                """INSERT INTO alerts(created_at, key, value, baseline, std, cusum, message)
+                   VALUES(?,?,?,?,?,?,?)""",
+                [(now, e.key, e.value, e.baseline, e.std, e.cusum, e.message) for e in events]
+            )
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        finally:
+            con.close()
+
+        if events and self.notifier:
+            self.notifier(events)
+        return events
+
+    def recent_alerts(self, limit: int = 50) -> List[tuple]:
+        con = self._conn()
+        try:
+            cur = con.execute(
+                """SELECT created_at, key, value, baseline, message
+                   FROM alerts ORDER BY id DESC LIMIT ?""",
+                (limit,)
+            )
+            return cur.fetchall()
+        finally:
+            con.close()
@@ -1,75 +1,177 @@
 from datetime import datetime, timezone
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
 import feedparser
+import requests
+import urllib3
 
 from domain.scoring import infer_category
-from domain.models import NewsItem
+from domain.batch import NewsBatch
+from infra.deadline import Deadline, DeadlineExceeded
+from infra.feed_stream import MAX_SUMMARY, MAX_TITLE, FeedEntry, NotAFeed, fetch_entries
+from infra.source_scheduler import SourceScheduler
+from infra.sources import load_sources
+from infra.url_filter import KnownUrlFilter, canonicalize_url
 
-RSS_SOURCES = [
-    ("Reuters", "https://www.reuters.com/rssFeed/topNews"),
-    ("BBC", "http://feeds.bbci.co.uk/news/rss.xml"),
-    ("The Guardian", "https://www.theguardian.com/world/rss"),
-    ("Al Jazeera", "https://www.aljazeera.com/xml/rss/all.xml"),
 
-    # --- AMÉRICAS ---
-    ("NYT_World", "https://rss.nytimes.com/services/xml/rss/nyt/World.xml"),
-    ("G1_Mundo", "https://g1.globo.com/dynamo/mundo/rss2.xml"),
-
-    # --- EUROPA/RUSSIA/UCRÂNIA ---
-    ("BBC_World", "http://feeds.bbci.co.uk/news/world/rss.xml"),
-    ("TASS_Russia", "https://tass.com/rss/v2.xml"),
-    ("KyivIndependent", "https://kyivindependent.com/rss/"),
-
-    # --- ORIENTE MÉDIO ---
-    ("Jerusalem_Post", "https://www.jpost.com/rss/rssfeedsheadlines.aspx"),
-    ("AlJazeera_English", "https://www.aljazeera.com/xml/rss/all.xml"),
-    ("Tehran_Times", "https://www.tehrantimes.com/rss"),
-
-    # --- ÁSIA ---
-    ("Global_Times_China", "https://www.globaltimes.cn/rss/index.xml"),
-    ("Taipei_Times", "https://www.taipeitimes.com/xml/index.xml"),
-]
-
-
-def _parse_dt(entry) -> datetime:
+def _parse_dt(entry) -> Optional[datetime]:
     if hasattr(entry, "published_parsed") and entry.published_parsed:
         return datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-    return datetime.now(timezone.utc)
-
-
-def collect_news(limit_per_source: int = 20) -> List[NewsItem]:
-    items: List[NewsItem] = []
+    return None
+
+
+_TIMEOUTS = (TimeoutError, requests.Timeout, urllib3.exceptions.TimeoutError)
+
+
+def _is_timeout(ex: Optional[BaseException]) -> bool:
+    # inclusive embrulhado: requests ConnectionError -> MaxRetryError -> ReadTimeoutError
+    for _ in range(8):
+        if ex is None:
+            return False
+        if isinstance(ex, _TIMEOUTS):
+            return True
+        inner = ex.args[0] if ex.args and isinstance(ex.args[0], BaseException) else None
+        ex = getattr(ex, "reason", None) or ex.__cause__ or inner or ex.__context__
+    return False
+
+
+def _feed_error(feed) -> Optional[str]:
+    # feedparser não levanta exceção: falha = HTTP >= 400 ou XML quebrado sem entradas
+    status = feed.get("status")
+    if status is not None and status >= 400:
+        return f"HTTP {status}"
+    if feed.get("bozo") and not feed.entries:
+        return repr(feed.get("bozo_exception", "feed inválido"))
+    return None
+
+
+def _feedparser_entries(content: bytes, limit: int,
+                        skip: Optional[Callable[[str], bool]] = None) -> List[FeedEntry]:
+    feed = feedparser.parse(content)
+    error = _feed_error(feed)
+    if error:
+        raise ValueError(error)
+    return [
+        FeedEntry(
+            title=getattr(e, "title", "")[:MAX_TITLE],
+            summary=getattr(e, "summary", "")[:MAX_SUMMARY],
+            link=getattr(e, "link", ""),
+            published_at=_parse_dt(e),
+            known=bool(skip and skip(getattr(e, "link", ""))),
+        )
+        for e in feed.entries[:limit]
+    ]
+
+
+def fetch_source(url: str, limit: int,
+                 skip: Optional[Callable[[str], bool]] = None,
+                 deadline: Optional[Deadline] = None) -> List[FeedEntry]:
+    # caminho rápido: streaming com parada após `limit` itens; feedparser só
+    # quando a raiz não é RSS/Atom ou o XML quebrou, sobre os bytes já baixados
+    try:
+        return fetch_entries(url, limit, skip=skip, deadline=deadline)
+    except NotAFeed as ex:
+        return _feedparser_entries(ex.content, limit, skip=skip)
+
+
+def _fetch_all(sources: Sequence[Tuple[str, str, str]], limit: int,
+               skip: Optional[Callable[[str], bool]], deadline: Optional[Deadline],
+               max_workers: int) -> Iterator[Tuple[Tuple[str, str, str], object]]:
+    """
+    Busca as fontes em paralelo e devolve (fonte, entradas | exceção) na ordem
+    em que terminam. No prazo, o que não terminou sai como DeadlineExceeded
+    (downloads em curso são abandonados; os que nem começaram, cancelados).
+    """
+    if not sources:
+        return
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sources))))
+    futures = {pool.submit(fetch_source, url, limit, skip, deadline): (source, url, region)
+               for source, url, region in sources}
+    pending = set(futures)
+    try:
+        for f in as_completed(futures, timeout=deadline.remaining() if deadline else None):
+            pending.discard(f)
+            ex = f.exception()
+            yield futures[f], (ex if ex is not None else f.result())
+    except FuturesTimeout:
+        pass
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    for f in pending:
+        yield futures[f], DeadlineExceeded("prazo esgotado antes da fonte responder")
+
+
+def collect_news(limit_per_source: int = 20,
+                 scheduler: Optional[SourceScheduler] = None,
+                 known: Optional[KnownUrlFilter] = None,
+                 sources: Optional[Sequence[Tuple[str, str, str]]] = None) -> NewsBatch:
+    return collect_news_until(None, limit_per_source, scheduler, known, sources)[0]
+
+
+def collect_news_until(deadline: Optional[Deadline],
+                       limit_per_source: int = 20,
+                       scheduler: Optional[SourceScheduler] = None,
+                       known: Optional[KnownUrlFilter] = None,
+                       sources: Optional[Sequence[Tuple[str, str, str]]] = None,
+                       max_workers: int = 8,
+                       force: bool = False) -> Tuple[NewsBatch, List[str]]:
+    """
+    Coleta com prazo: fontes em paralelo; ao fim do prazo devolve o que já
+    chegou + os nomes das fontes puladas (continuam vencidas no scheduler).
+    """
+    # lote colunar: sem um NewsItem por notícia; iterar o lote ainda devolve NewsItem
+    batch = NewsBatch()
+    skipped: List[str] = []
+    seen = set()
 
-    for source, url in RSS_SOURCES:
-        feed = feedparser.parse(url)
+    # fontes: explícitas > DOOMSDAY_SOURCES (ex.: replay local) > RSS_SOURCES
+    sources = load_sources() if sources is None else sources
+    # com scheduler: só as fontes vencidas (taxa aprendida / backoff / circuito)
+    # (force: também as saudáveis antes do intervalo, ver SourceScheduler.due)
+    sources = scheduler.due(sources, force=force) if scheduler else sources
+
+    # URLs já no banco são descartadas dentro do parser, antes de qualquer extração
+    skip = known.is_known if known else None
+    for (source, url, region), result in _fetch_all(sources, limit_per_source, skip,
+                                                    deadline, max_workers):
+        # culpa do prazo, não da fonte: sem backoff (o timeout HTTP é cortado no prazo)
+        if isinstance(result, DeadlineExceeded) or (
+                deadline is not None and deadline.expired and _is_timeout(result)):
+            skipped.append(source)
+            continue
+        if isinstance(result, BaseException):
+            if scheduler:
+                scheduler.record_failure(source, repr(result))
+            continue
+        entries = result
+        if scheduler:
+            scheduler.record_success(
+                source, [e.published_at.timestamp() for e in entries if e.published_at]
+            )
 
-        for e in feed.entries[:limit_per_source]:
-            title = getattr(e, "title", "")[:500]
-            summary = getattr(e, "summary", "")[:2000]
-            link = getattr(e, "link", "")
+        now = datetime.now(timezone.utc).timestamp()
+        for e in entries:
+            if e.known:
+                continue
+            # remove duplicados por URL
+            link = canonicalize_url(e.link)
+            if not link or link in seen:
+                continue
+            seen.add(link)
 
             # 🔥 AJUSTE 4.4: inferir categoria por notícia
-            text = f"{title}\n{summary}"
+            text = f"{e.title}\n{e.summary}"
             cat = infer_category(text)
 
-            items.append(
-                NewsItem(
-                    source=source,
-                    title=title,
-                    summary=summary,
-                    url=link,
-                    published_at=_parse_dt(e),
-                    category=cat,  # ✅ salva categoria
-                )
+            batch.append(
+                source=source,
+                title=e.title,
+                summary=e.summary,
+                url=link,
+                published_ts=e.published_at.timestamp() if e.published_at else now,
+                category=cat,  # ✅ salva categoria
+                region=region,
             )
 
-    # remove duplicados por URL
-    seen = set()
-    unique: List[NewsItem] = []
-
-    for it in items:
-        if it.url and it.url not in seen:
-            seen.add(it.url)
-            unique.append(it)
-
-    return unique
\ No newline at end of file
+    return batch, skipped
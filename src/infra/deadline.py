@@ -0,0 +1,40 @@
+# src/infra/deadline.py
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Tuple, Union
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+@dataclass(frozen=True)
+class Deadline:
+    """Instante limite absoluto (relógio monotônico) repassado camada a camada."""
+    at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.at
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded("prazo esgotado")
+
+    def reserve(self, seconds: float) -> "Deadline":
+        """Prazo mais cedo, guardando `seconds` para as etapas seguintes."""
+        return Deadline(self.at - seconds)
+
+    def http_timeout(self, cap: Union[float, Tuple[float, float]]) -> Tuple[float, float]:
+        """(connect, read) do cliente HTTP limitado ao tempo restante."""
+        if isinstance(cap, (int, float)):
+            cap = (cap, cap)
+        left = max(0.1, self.remaining())
+        return (min(cap[0], left), min(cap[1], left))
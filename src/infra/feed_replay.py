@@ -0,0 +1,159 @@
+# src/infra/feed_replay.py
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Sequence, Tuple
+
+from infra.http_client import get_client
+from infra.sources import RSS_SOURCES
+
+MANIFEST = "manifest.json"
+
+@dataclass(frozen=True)
+class ReplayConfig:
+    latency_ms: float = 0.0       # atraso fixo por resposta
+    jitter_ms: float = 0.0        # + atraso aleatório 0..jitter
+    error_rate: float = 0.0       # fração de respostas 503
+    scale: int = 1                # quantas cópias sintéticas de cada snapshot
+    seed: Optional[int] = None
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+
+def record_feeds(out_dir: str, sources: Sequence[Tuple[str, str, str]] = RSS_SOURCES) -> List[dict]:
+    """Salva a resposta bruta de cada feed + manifest.json (nome, url, região, arquivo)."""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = []
+    for name, url, region in sources:
+        try:
+            r = get_client().get(url)
+            r.raise_for_status()
+        except Exception as ex:
+            print(f"   ❌ {name}: {ex!r}")
+            continue
+        fname = f"{_slug(name)}.xml"
+        with open(os.path.join(out_dir, fname), "wb") as fh:
+            fh.write(r.content)
+        manifest.append({"name": name, "url": url, "region": region, "file": fname})
+    with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, ensure_ascii=False, indent=2)
+    return manifest
+
+_RSS_LINK = re.compile(rb"(<link>\s*)([^<\s]+)(\s*</link>)")
+_ATOM_LINK = re.compile(rb"(<link\b[^>]*\bhref=\")([^\"]+)(\")")
+
+def _replicate(body: bytes, replica: int) -> bytes:
+    """Cópia sintética: links ganham ?replica=N (URLs únicas por feed)."""
+    if replica == 0:
+        return body
+
+    def fix(m):
+        link = m.group(2)
+        sep = b"&amp;" if b"?" in link else b"?"
+        return m.group(1) + link + sep + b"replica=" + str(replica).encode() + m.group(3)
+
+    return _ATOM_LINK.sub(fix, _RSS_LINK.sub(fix, body))
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Servidor local que serve os snapshots gravados:
+      GET /sources.json   -> [[nome, url, região], ...] (scale x snapshots)
+      GET /feeds/<i>.xml  -> snapshot i % n, com links reescritos para i >= n
+    """
+    daemon_threads = True
+
+    def __init__(self, fixtures_dir: str, cfg: ReplayConfig = ReplayConfig(),
+                 host: str = "127.0.0.1", port: int = 8765):
+        with open(os.path.join(fixtures_dir, MANIFEST), encoding="utf-8") as fh:
+            self.manifest = json.load(fh)
+        if not self.manifest:
+            raise ValueError(f"Nenhum snapshot em {fixtures_dir}.")
+        self.bodies = []
+        for m in self.manifest:
+            with open(os.path.join(fixtures_dir, m["file"]), "rb") as fh:
+                self.bodies.append(fh.read())
+        self.cfg = cfg
+        self.rng = random.Random(cfg.seed)
+        super().__init__((host, port), _ReplayHandler)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def sources(self) -> List[Tuple[str, str, str]]:
+        n = len(self.manifest)
+        out = []
+        for i in range(n * max(1, self.cfg.scale)):
+            m = self.manifest[i % n]
+            name = m["name"] if i < n else f"{m['name']}#{i // n}"
+            out.append((name, f"{self.base_url}/feeds/{i}.xml", m["region"]))
+        return out
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    server: ReplayServer
+
+    def log_message(self, format, *args):  # silencioso em carga
+        pass
+
+    def _send(self, status: int, body: bytes, ctype: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        srv = self.server
+        cfg = srv.cfg
+        delay = cfg.latency_ms + (srv.rng.random() * cfg.jitter_ms if cfg.jitter_ms else 0.0)
+        if delay:
+            time.sleep(delay / 1000.0)
+
+        if self.path == "/sources.json":
+            body = json.dumps(srv.sources(), ensure_ascii=False).encode("utf-8")
+            return self._send(200, body, "application/json")
+
+        m = re.fullmatch(r"/feeds/(\d+)\.xml", self.path)
+        if not m:
+            return self._send(404, b"not found", "text/plain")
+        i = int(m.group(1))
+        n = len(srv.bodies)
+        if i >= n * max(1, cfg.scale):
+            return self._send(404, b"not found", "text/plain")
+        if cfg.error_rate and srv.rng.random() < cfg.error_rate:
+            return self._send(503, b"injected error", "text/plain")
+        return self._send(200, _replicate(srv.bodies[i % n], i // n), "application/rss+xml")
+
+if __name__ == "__main__":
+    # (a partir de src/)
+    #   python -m infra.feed_replay record --dir ../fixtures/feeds
+    #   python -m infra.feed_replay serve --dir ../fixtures/feeds --scale 1000 --latency-ms 50
+    parser = argparse.ArgumentParser(description="Grava/serve snapshots de feeds RSS.")
+    parser.add_argument("mode", choices=["record", "serve"])
+    parser.add_argument("--dir", default=os.path.join("..", "fixtures", "feeds"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        print(f"{len(record_feeds(args.dir))} feeds gravados em {args.dir}")
+    else:
+        server = ReplayServer(args.dir, ReplayConfig(args.latency_ms, args.jitter_ms,
+                                                     args.error_rate, args.scale, args.seed),
+                              host=args.host, port=args.port)
+        print(f"{len(server.sources())} feeds em {server.base_url}/sources.json")
+        print(f"DOOMSDAY_SOURCES={server.base_url}/sources.json")
+        server.serve_forever()
@@ -0,0 +1,191 @@
+# src/infra/feed_stream.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, List, Optional
+
+from lxml import etree
+
+from infra.deadline import Deadline
+from infra.http_client import get_client
+
+MAX_FEED_BYTES = 2 * 1024 * 1024   # nenhum feed precisa de mais que isso para 20 itens
+MAX_TITLE = 500
+MAX_SUMMARY = 2000
+FEED_ROOTS = ("rss", "feed", "RDF")   # RSS 2.0, Atom, RSS 1.0 (rdf:RDF)
+
+@dataclass(frozen=True)
+class FeedEntry:
+    title: str
+    summary: str
+    link: str
+    published_at: Optional[datetime]
+    known: bool = False        # já está no banco: só link/data foram lidos
+
+class NotAFeed(ValueError):
+    """Raiz não é RSS/Atom (ou o XML quebrou); `content` traz os bytes já baixados."""
+
+    def __init__(self, message: str, content: bytes = b""):
+        super().__init__(message)
+        self.content = content
+
+class _CappedReader:
+    """
+    File-like sobre o stream HTTP que devolve EOF depois de max_bytes
+    (e levanta DeadlineExceeded se o prazo acabar no meio do download).
+    Guarda o que leu: um fallback reaproveita os bytes sem baixar de novo.
+    """
+
+    def __init__(self, raw, max_bytes: int, deadline: Optional[Deadline] = None):
+        self._raw = raw
+        self._left = max_bytes
+        self._deadline = deadline
+        self._buf = bytearray()
+
+    def read(self, n: int = -1) -> bytes:
+        if self._deadline is not None:
+            self._deadline.check()
+        if self._left <= 0:
+            return b""
+        if n is None or n < 0 or n > self._left:
+            n = self._left
+        chunk = self._raw.read(n)
+        self._left -= len(chunk)
+        self._buf += chunk
+        return chunk
+
+    def drain(self) -> bytes:
+        """Lê o resto (até max_bytes) e devolve tudo que passou pelo reader."""
+        while self.read(64 * 1024):
+            pass
+        return bytes(self._buf)
+
+def _local(tag) -> str:
+    # "{http://www.w3.org/2005/Atom}entry" -> "entry"
+    if not isinstance(tag, str):
+        return ""
+    return tag.rsplit("}", 1)[-1]
+
+def _text(el) -> str:
+    return "".join(el.itertext()).strip()
+
+def parse_date(value: str) -> Optional[datetime]:
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        dt = parsedate_to_datetime(value)          # RSS (RFC 822)
+    except (TypeError, ValueError):
+        try:
+            # Atom / dc:date (ISO 8601); fromisoformat só aceita "Z" a partir do 3.11
+            if value[-1] in "Zz":
+                value = value[:-1] + "+00:00"
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+def _link_of(el) -> str:
+    for child in el:
+        if _local(child.tag) != "link":
+            continue
+        # RSS: texto | Atom: href (rel="alternate" ou sem rel)
+        href = child.get("href")
+        if href is None:
+            return (child.text or "").strip()
+        if child.get("rel", "alternate") == "alternate":
+            return href.strip()
+    return ""
+
+def _date_of(el) -> Optional[datetime]:
+    for child in el:
+        if _local(child.tag) in ("pubDate", "published", "date", "updated"):
+            return parse_date(child.text or "")
+    return None
+
+def _entry_from(el, max_title: int, max_summary: int,
+                skip: Optional[Callable[[str], bool]] = None) -> FeedEntry:
+    # link primeiro: item já conhecido não paga extração de título/resumo
+    link = _link_of(el)
+    if skip is not None and link and skip(link):
+        return FeedEntry(title="", summary="", link=link, published_at=_date_of(el), known=True)
+
+    title = summary = ""
+    published = None
+    for child in el:
+        name = _local(child.tag)
+        if name == "title" and not title:
+            title = _text(child)[:max_title]
+        elif name in ("description", "summary") and not summary:
+            summary = _text(child)[:max_summary]
+        elif name in ("content", "encoded") and not summary:
+            summary = _text(child)[:max_summary]
+        elif name in ("pubDate", "published", "date", "updated") and published is None:
+            published = parse_date(child.text or "")
+    return FeedEntry(title=title, summary=summary, link=link, published_at=published)
+
+def iter_entries(stream, limit: int,
+                 max_title: int = MAX_TITLE,
+                 max_summary: int = MAX_SUMMARY,
+                 skip: Optional[Callable[[str], bool]] = None) -> Iterator[FeedEntry]:
+    """
+    Parse incremental (RSS <item> / Atom <entry>) que para depois de `limit` entradas.
+    Cada entrada é descartada da árvore logo após ser lida (memória constante).
+    `skip(link)` verdadeiro marca a entrada como known e pula o resto da extração.
+    NotAFeed se a raiz não é RSS/Atom ou o XML não pode ser lido.
+    """
+    if limit <= 0:
+        return
+    ctx = etree.iterparse(stream, events=("start", "end"), recover=True,
+                          resolve_entities=False, no_network=True)
+    count = 0
+    root_checked = False
+    try:
+        for event, el in ctx:
+            if event == "start":
+                if not root_checked:
+                    root_checked = True
+                    if _local(el.tag) not in FEED_ROOTS:
+                        raise NotAFeed(f"raiz <{_local(el.tag)}> não é RSS/Atom")
+                continue
+            if _local(el.tag) not in ("item", "entry"):
+                continue
+            yield _entry_from(el, max_title, max_summary, skip)
+            # libera o elemento e os irmãos já processados
+            el.clear()
+            parent = el.getparent()
+            if parent is not None:
+                while el.getprevious() is not None:
+                    del parent[0]
+            count += 1
+            if count >= limit:
+                return
+    except etree.XMLSyntaxError as ex:
+        raise NotAFeed(f"XML ilegível: {ex}") from ex
+    if not root_checked:
+        raise NotAFeed("documento vazio")
+
+def fetch_entries(url: str, limit: int,
+                  timeout: Optional[float] = None,
+                  max_bytes: int = MAX_FEED_BYTES,
+                  skip: Optional[Callable[[str], bool]] = None,
+                  deadline: Optional[Deadline] = None) -> List[FeedEntry]:
+    """
+    Baixa o feed em streaming e para no que vier primeiro: `limit` entradas
+    ou `max_bytes` lidos. O resto da resposta nunca é baixado.
+    Feed válido sem itens devolve []; NotAFeed (com os bytes até max_bytes)
+    se não é RSS/Atom.
+    """
+    if deadline is not None:
+        deadline.check()
+        timeout = deadline.http_timeout(timeout or get_client().cfg.timeout)
+    with get_client().stream(url, timeout=timeout, retry=deadline is None) as r:
+        reader = _CappedReader(r.raw, max_bytes, deadline)
+        try:
+            return list(iter_entries(reader, limit, skip=skip))
+        except NotAFeed as ex:
+            raise NotAFeed(str(ex), reader.drain()) from ex
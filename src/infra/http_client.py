@@ -0,0 +1,147 @@
+# src/infra/http_client.py
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:  # urllib3 decodifica "br" sozinho quando brotli está instalado
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        _ACCEPT_ENCODING = "gzip, deflate"
+
+Timeout = Union[float, Tuple[float, float]]
+
+@dataclass(frozen=True)
+class HttpConfig:
+    timeout: Tuple[float, float] = (5.0, 15.0)   # (connect, read)
+    retries: int = 2
+    backoff_factor: float = 0.5                  # 0.5s, 1s, 2s...
+    backoff_jitter: float = 0.3                  # + até 0.3s aleatórios
+    pool_connections: int = 32                   # hosts com pool próprio
+    pool_maxsize: int = 8                        # conexões keep-alive por host
+    max_bytes: int = 5 * 1024 * 1024
+    user_agent: str = "Mozilla/5.0"
+
+class ResponseTooLarge(ValueError):
+    pass
+
+@dataclass(frozen=True)
+class HttpResponse:
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    encoding: Optional[str] = field(default=None)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code} para {self.url}")
+
+class HttpClient:
+    """
+    Sessão HTTP única para toda a infra: pool keep-alive por host (TLS reaproveitado),
+    retries limitados com backoff + jitter, timeouts padrão e limite de tamanho de resposta.
+    Com retry=False (chamadas com prazo) usa uma segunda sessão sem retries: o
+    backoff do urllib3 não respeita o tempo restante.
+    """
+
+    def __init__(self, cfg: HttpConfig = HttpConfig()):
+        self.cfg = cfg
+        self.session = self._new_session(Retry(
+            total=cfg.retries,
+            connect=cfg.retries,
+            read=cfg.retries,
+            status=cfg.retries,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            backoff_factor=cfg.backoff_factor,
+            backoff_jitter=cfg.backoff_jitter,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        ))
+        self.single_shot = self._new_session(Retry(0, read=False))
+
+    def _new_session(self, retry: Retry) -> requests.Session:
+        adapter = HTTPAdapter(pool_connections=self.cfg.pool_connections,
+                              pool_maxsize=self.cfg.pool_maxsize,
+                              max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "User-Agent": self.cfg.user_agent,
+            "Accept-Encoding": _ACCEPT_ENCODING,
+        })
+        return session
+
+    @contextmanager
+    def stream(self, url: str, timeout: Optional[Timeout] = None,
+               headers: Optional[Dict[str, str]] = None,
+               retry: bool = True) -> Iterator[requests.Response]:
+        """Resposta em streaming (corpo não lido); status >= 400 levanta HTTPError."""
+        session = self.session if retry else self.single_shot
+        r = session.get(url, stream=True, timeout=timeout or self.cfg.timeout, headers=headers)
+        try:
+            r.raise_for_status()
+            r.raw.decode_content = True
+            yield r
+        finally:
+            r.close()
+
+    def get(self, url: str, timeout: Optional[Timeout] = None,
+            headers: Optional[Dict[str, str]] = None,
+            max_bytes: Optional[int] = None,
+            retry: bool = True) -> HttpResponse:
+        """GET com corpo lido até max_bytes (ResponseTooLarge acima disso)."""
+        max_bytes = max_bytes or self.cfg.max_bytes
+        session = self.session if retry else self.single_shot
+        r = session.get(url, stream=True, timeout=timeout or self.cfg.timeout, headers=headers)
+        try:
+            declared = r.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > max_bytes:
+                raise ResponseTooLarge(f"{url}: {declared} bytes > {max_bytes}")
+            buf = bytearray()
+            for chunk in r.iter_content(64 * 1024):
+                buf += chunk
+                if len(buf) > max_bytes:
+                    raise ResponseTooLarge(f"{url}: resposta maior que {max_bytes} bytes")
+            return HttpResponse(
+                url=r.url,
+                status_code=r.status_code,
+                headers=dict(r.headers),
+                content=bytes(buf),
+                encoding=r.encoding,
+            )
+        finally:
+            r.close()
+
+    def close(self) -> None:
+        self.session.close()
+        self.single_shot.close()
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+def get_client() -> HttpClient:
+    """Cliente compartilhado do processo (criado sob demanda)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
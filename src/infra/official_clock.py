@@ -6,9 +6,10 @@ from dataclasses import dataclass
 from datetime import date
 from typing import Optional
 
-import requests
 from bs4 import BeautifulSoup
 
+from infra.http_client import get_client
+
 BULLETIN_CLOCK_URL = "https://thebulletin.org/doomsday-clock/"
 
 @dataclass(frozen=True)
@@ -18,15 +19,17 @@ class OfficialClock:
     source_url: str
 
 def fetch_official_clock(timeout: int = 15) -> OfficialClock:
+    """Lê a página oficial do Bulletin e extrai o valor atual em segundos."""
+    r = get_client().get(BULLETIN_CLOCK_URL, timeout=timeout)
+    r.raise_for_status()
+    return parse_official_clock(r.text)
+
+def parse_official_clock(page_html: str) -> OfficialClock:
     """
-    Lê a página oficial do Bulletin e extrai o valor atual em segundos.
-    Exemplo de texto na página:
+    Extrai o valor do HTML da página do Bulletin. Exemplo de texto na página:
       "On January 27, 2026, the Doomsday Clock was set at 85 seconds to midnight"
     """
-    r = requests.get(BULLETIN_CLOCK_URL, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
-    r.raise_for_status()
-
-    soup = BeautifulSoup(r.text, "html.parser")
+    soup = BeautifulSoup(page_html, "html.parser")
     text = soup.get_text(" ", strip=True)
 
     # seconds
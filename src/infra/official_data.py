@@ -0,0 +1,202 @@
+# src/infra/official_data.py
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional
+
+from infra.deadline import Deadline
+from infra.http_client import get_client
+from infra.official_clock import BULLETIN_CLOCK_URL, parse_official_clock
+from infra.official_timeline import WIKI_URL, parse_timeline_html
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS official_data (
+  name TEXT PRIMARY KEY,
+  payload TEXT,                         -- último resultado validado (JSON)
+  fetched_at REAL,                      -- quando o payload foi confirmado (200 ou 304)
+  etag TEXT,
+  last_modified TEXT,
+  failures INTEGER NOT NULL DEFAULT 0,  -- falhas seguidas (rede, HTTP ou validação)
+  next_attempt_at REAL NOT NULL DEFAULT 0,
+  last_error TEXT
+);
+"""
+
+# ---------------------------
+# Parse + validação: HTML -> payload JSON (ValueError se não parece certo)
+# ---------------------------
+def clock_payload(page_html: str) -> Dict:
+    o = parse_official_clock(page_html)
+    if not 0 < o.seconds_to_midnight < 24 * 3600:
+        raise ValueError(f"valor oficial fora da faixa: {o.seconds_to_midnight}s")
+    return {
+        "seconds_to_midnight": o.seconds_to_midnight,
+        "as_of": o.as_of.isoformat() if o.as_of else None,
+        "source_url": o.source_url,
+    }
+
+def timeline_payload(page_html: str) -> List[List[int]]:
+    points = parse_timeline_html(page_html)
+    this_year = date.today().year
+    points = [p for p in points if 1947 <= p.year <= this_year + 1 and 0 < p.seconds_to_midnight <= 20 * 60]
+    if len(points) < 10 or points[0].year != 1947:
+        raise ValueError(f"timeline oficial incompleta ({len(points)} pontos)")
+    return [[p.year, p.seconds_to_midnight] for p in points]
+
+@dataclass(frozen=True)
+class OfficialSource:
+    name: str
+    url: str
+    parse: Callable[[str], object]
+    max_age_s: float                # idade a partir da qual busca de novo
+
+OFFICIAL_SOURCES = (
+    OfficialSource("clock", BULLETIN_CLOCK_URL, clock_payload, 24 * 3600),
+    OfficialSource("timeline", WIKI_URL, timeline_payload, 7 * 86400),
+)
+
+@dataclass(frozen=True)
+class OfficialRecord:
+    name: str
+    payload: Optional[object]
+    fetched_at: Optional[float]
+    failures: int
+    next_attempt_at: float
+    last_error: Optional[str]
+
+class OfficialDataRefresher:
+    """
+    Dados oficiais (relógio do Bulletin, timeline da Wikipedia) num só lugar:
+    busca concorrente só do que venceu, GET condicional (ETag/Last-Modified),
+    grava apenas payload validado e, em falha, mantém o anterior e espera um
+    backoff exponencial antes de tentar de novo (cache negativo).
+    """
+
+    def __init__(self, db_path: str, sources: Iterable[OfficialSource] = OFFICIAL_SOURCES,
+                 retry_base_s: float = 300.0, retry_max_s: float = 6 * 3600.0):
+        self.db_path = db_path
+        self.sources = {s.name: s for s in sources}
+        self.retry_base_s = retry_base_s
+        self.retry_max_s = retry_max_s
+        with self._conn() as con:
+            con.executescript(SCHEMA)
+
+    def _conn(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _rows(self) -> Dict[str, tuple]:
+        with self._conn() as con:
+            return {r[0]: r for r in con.execute(
+                """SELECT name, payload, fetched_at, etag, last_modified, failures,
+                          next_attempt_at, last_error
+                   FROM official_data"""
+            )}
+
+    def get(self, name: str) -> Optional[OfficialRecord]:
+        r = self._rows().get(name)
+        if r is None:
+            return None
+        return OfficialRecord(r[0], json.loads(r[1]) if r[1] else None, r[2], r[5], r[6], r[7])
+
+    def freshness(self, now: Optional[float] = None) -> Dict[str, Dict]:
+        """Por fonte: idade do dado, se está velho e o estado do backoff (sem rede)."""
+        now = time.time() if now is None else now
+        rows = self._rows()
+        out = {}
+        for name, src in self.sources.items():
+            r = rows.get(name)
+            fetched_at = r[2] if r else None
+            age = now - fetched_at if fetched_at else None
+            out[name] = {
+                "fetched_at": fetched_at,
+                "age_s": age,
+                "stale": age is None or age > src.max_age_s,
+                "failures": r[5] if r else 0,
+                "next_attempt_at": r[6] if r else 0.0,
+                "last_error": r[7] if r else None,
+            }
+        return out
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Fontes velhas (ou nunca buscadas) cujo backoff já passou."""
+        now = time.time() if now is None else now
+        return [name for name, f in self.freshness(now).items()
+                if f["stale"] and f["next_attempt_at"] <= now]
+
+    def refresh(self, force: bool = False, timeout: float = 15.0,
+                deadline: Optional[Deadline] = None,
+                on_done: Optional[Callable[[str, str], None]] = None) -> Dict[str, str]:
+        """
+        Busca em paralelo as fontes vencidas (todas, com force) e devolve
+        nome -> "updated" | "not_modified" | "failed: ..." | "pending".
+        Com deadline: sem retries e espera só o tempo restante; o que não terminou
+        fica "pending" e segue gravando em segundo plano (on_done avisa cada
+        fonte ao terminar, mesmo depois do retorno).
+        """
+        names = list(self.sources) if force else self.due()
+        if not names or (deadline is not None and deadline.remaining() < 1.0):
+            return {}
+        rows = self._rows()
+        http_timeout = deadline.http_timeout(timeout) if deadline is not None else timeout
+        pool = ThreadPoolExecutor(max_workers=len(names))
+        futures = {n: pool.submit(self._fetch_one, self.sources[n], rows.get(n), http_timeout,
+                                  deadline is None)
+                   for n in names}
+        if on_done is not None:
+            for n, f in futures.items():
+                f.add_done_callback(lambda f, n=n: on_done(n, f.result()))
+        wait(futures.values(), timeout=deadline.remaining() if deadline is not None else None)
+        pool.shutdown(wait=False)
+        return {n: f.result() if f.done() else "pending" for n, f in futures.items()}
+
+    def _fetch_one(self, src: OfficialSource, row: Optional[tuple], timeout,
+                   retry: bool = True) -> str:
+        now = time.time()
+        headers = {}
+        if row and row[1]:
+            # só condicional se há payload válido para reaproveitar
+            if row[3]:
+                headers["If-None-Match"] = row[3]
+            if row[4]:
+                headers["If-Modified-Since"] = row[4]
+        try:
+            r = get_client().get(src.url, timeout=timeout, headers=headers or None, retry=retry)
+            if r.status_code == 304:
+                with self._conn() as con:
+                    con.execute(
+                        """UPDATE official_data SET fetched_at = ?, failures = 0,
+                                  next_attempt_at = 0, last_error = NULL
+                           WHERE name = ?""",
+                        (now, src.name)
+                    )
+                return "not_modified"
+            r.raise_for_status()
+            payload = src.parse(r.text)
+        except Exception as ex:
+            failures = (row[5] if row else 0) + 1
+            backoff = min(self.retry_max_s, self.retry_base_s * 2 ** (failures - 1))
+            with self._conn() as con:
+                con.execute(
+                    """INSERT INTO official_data(name, failures, next_attempt_at, last_error)
+                       VALUES(?, ?, ?, ?)
+                       ON CONFLICT(name) DO UPDATE SET failures = excluded.failures,
+                         next_attempt_at = excluded.next_attempt_at, last_error = excluded.last_error""",
+                    (src.name, failures, now + backoff, repr(ex)[:500])
+                )
+            return f"failed: {ex!r}"
+
+        headers = {k.lower(): v for k, v in r.headers.items()}
+        with self._conn() as con:
+            con.execute(
+                """INSERT OR REPLACE INTO official_data(name, payload, fetched_at, etag, last_modified,
+                                                         failures, next_attempt_at, last_error)
+                   VALUES(?, ?, ?, ?, ?, 0, 0, NULL)""",
+                (src.name, json.dumps(payload, ensure_ascii=False), now,
+                 headers.get("etag"), headers.get("last-modified"))
+            )
+        return "updated"
@@ -2,10 +2,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from io import StringIO
 from typing import List, Tuple
 
 import pandas as pd
-import requests
+
+from infra.http_client import get_client
 
 WIKI_URL = "https://en.wikipedia.org/wiki/Doomsday_Clock"
 
@@ -30,9 +32,13 @@ def _to_seconds(value) -> int:
     n = int(float(s))
     return n * 60
 
-def fetch_timeline_from_wikipedia() -> List[TimelinePoint]:
-    html = requests.get(WIKI_URL, timeout=20, headers={"User-Agent": "Mozilla/5.0"}).text
-    tables = pd.read_html(html)
+def fetch_timeline_from_wikipedia(timeout=20) -> List[TimelinePoint]:
+    r = get_client().get(WIKI_URL, timeout=timeout)
+    r.raise_for_status()
+    return parse_timeline_html(r.text)
+
+def parse_timeline_html(page_html: str) -> List[TimelinePoint]:
+    tables = pd.read_html(StringIO(page_html))
 
     # A tabela "Timeline of the Doomsday Clock" normalmente é a maior/mais relevante com coluna Year.
     # Vamos achar a primeira que contenha "Year" e alguma coluna que represente "midnight" (min/seconds).
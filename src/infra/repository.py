@@ -1,8 +1,19 @@
+import json
+import os
 import sqlite3
+import time
+from dataclasses import asdict
 from datetime import datetime
-from typing import Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+from  domain.batch import NewsBatch, ScoreBatch, to_epoch
 from  domain.models import NewsItem, ThreatScore
+from  domain.scoring import (DEFAULT_KEYWORDS, DEFAULT_SOURCE_WEIGHTS, SCORING_VERSION,
+                             ScoringConfig, recency_decay, risk_to_minutes)
+from  infra.official_timeline import TimelinePoint
+from  infra.sources import DEFAULT_REGION, SOURCE_REGIONS
+from  infra.summary_codec import SummaryCodec, strip_html, train_zdict
+from  infra.url_filter import canonicalize_url
 
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS news (
@@ -11,11 +22,23 @@ CREATE TABLE IF NOT EXISTS news (
   title TEXT NOT NULL,
   summary TEXT NOT NULL,
   category TEXT NOT NULL DEFAULT 'Geral',
-  published_at TEXT NOT NULL
+  published_at TEXT NOT NULL,
+  region TEXT NOT NULL DEFAULT 'Global',
+  summary_z BLOB            -- resumo comprimido (summary fica ''), ver summary_dicts
 );
 
+-- dicionários zlib treinados nos resumos; o blob comprimido guarda o id
+CREATE TABLE IF NOT EXISTS summary_dicts (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  zdict BLOB NOT NULL,
+  samples INTEGER NOT NULL,
+  created_at REAL NOT NULL
+);
+
+-- um conjunto de scores por versão de scoring (ver score_versions)
 CREATE TABLE IF NOT EXISTS scores (
-  url TEXT PRIMARY KEY,
+  url TEXT NOT NULL,
+  version TEXT NOT NULL DEFAULT 'v1',
   sentiment REAL NOT NULL,
   keywords REAL NOT NULL,
   source_weight REAL NOT NULL,
@@ -23,85 +46,890 @@ CREATE TABLE IF NOT EXISTS scores (
   final REAL NOT NULL,
   label TEXT NOT NULL,
   calculated_at TEXT NOT NULL,
+  published_ts REAL NOT NULL DEFAULT 0,
+  PRIMARY KEY(url, version),
   FOREIGN KEY(url) REFERENCES news(url)
 );
+
+CREATE TABLE IF NOT EXISTS score_versions (
+  version TEXT PRIMARY KEY,
+  config TEXT NOT NULL DEFAULT '{}',
+  created_at TEXT NOT NULL,
+  keywords TEXT,                   -- JSON; NULL = DEFAULT_KEYWORDS do código
+  sources TEXT                     -- JSON; NULL = DEFAULT_SOURCE_WEIGHTS do código
+);
+
+-- agregados por minuto dos scores já arquivados (mantém o histórico)
+CREATE TABLE IF NOT EXISTS risk_rollup (
+  version TEXT NOT NULL DEFAULT 'v1',
+  ts_minute TEXT NOT NULL,
+  risk_sum REAL NOT NULL,
+  n INTEGER NOT NULL,
+  PRIMARY KEY(version, ts_minute)
+);
+
+-- agregados por (versão, região, categoria, hora de publicação),
+-- mantidos pelos triggers de scores: o breakdown lê só os grupos.
+-- Guarda as somas dos componentes (sem a recência): a leitura aplica o mesmo
+-- recency_decay do risco global pela hora do bucket
+CREATE TABLE IF NOT EXISTS risk_agg (
+  version TEXT NOT NULL,
+  region TEXT NOT NULL,
+  category TEXT NOT NULL,
+  bucket INTEGER NOT NULL,
+  n INTEGER NOT NULL,
+  sentiment_sum REAL NOT NULL,
+  keywords_sum REAL NOT NULL,
+  source_sum REAL NOT NULL,
+  PRIMARY KEY(version, region, category, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+  key TEXT PRIMARY KEY,
+  value TEXT NOT NULL
+);
+
+-- snapshot pronto da primeira tela do dashboard (um por versão de scoring)
+CREATE TABLE IF NOT EXISTS dashboard_snapshot (
+  scoring_version TEXT PRIMARY KEY,
+  data_version INTEGER NOT NULL,
+  created_at REAL NOT NULL,
+  payload TEXT NOT NULL
+);
+
+-- timeline oficial persistida (um ponto por ano de anúncio)
+CREATE TABLE IF NOT EXISTS official_timeline (
+  year INTEGER PRIMARY KEY,
+  seconds_to_midnight INTEGER NOT NULL,
+  fetched_at REAL NOT NULL
+);
+
+-- modelo x oficial por dia: risco médio das notícias publicadas no dia convertido
+-- em minutos, com o ponto oficial vigente naquele dia (as-of join por ano)
+CREATE TABLE IF NOT EXISTS risk_vs_official (
+  version TEXT NOT NULL,
+  day TEXT NOT NULL,               -- YYYY-MM-DD (UTC, de published_ts)
+  risk_sum REAL NOT NULL,          -- inclui archived_sum
+  n INTEGER NOT NULL,
+  archived_sum REAL NOT NULL DEFAULT 0,  -- parte já movida para o arquivo pela retenção
+  archived_n INTEGER NOT NULL DEFAULT 0,
+  model_minutes REAL NOT NULL,
+  official_year INTEGER,
+  official_seconds INTEGER,
+  PRIMARY KEY(version, day)
+);
+
+-- fila durável coleta -> scoring: upsert_news enfileira, workers alugam (lease),
+-- ack remove; attempts >= max_attempts fica parado como "dead" (com last_error)
+CREATE TABLE IF NOT EXISTS score_queue (
+  url TEXT PRIMARY KEY,
+  enqueued_at REAL NOT NULL,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  lease_owner TEXT,
+  lease_until REAL NOT NULL DEFAULT 0,
+  last_error TEXT
+);
 """
 
+# índices rodam depois das migrações (colunas novas já existem)
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_scores_version_published ON scores(version, published_ts);
+CREATE INDEX IF NOT EXISTS idx_score_queue_ready ON score_queue(lease_until, enqueued_at);
+CREATE INDEX IF NOT EXISTS idx_news_published ON news(published_at);
+
+CREATE TRIGGER IF NOT EXISTS trg_scores_agg_insert AFTER INSERT ON scores
+BEGIN
+  INSERT INTO risk_agg(version, region, category, bucket, n, sentiment_sum, keywords_sum, source_sum)
+  VALUES(NEW.version,
+         COALESCE((SELECT region FROM news WHERE url = NEW.url), 'Global'),
+         COALESCE((SELECT category FROM news WHERE url = NEW.url), 'Geral'),
+         CAST(NEW.published_ts / 3600 AS INTEGER), 1,
+         NEW.sentiment, NEW.keywords, NEW.source_weight)
+  ON CONFLICT(version, region, category, bucket) DO UPDATE SET
+    n = n + 1,
+    sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+    keywords_sum = keywords_sum + excluded.keywords_sum,
+    source_sum = source_sum + excluded.source_sum;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_scores_agg_delete AFTER DELETE ON scores
+BEGIN
+  UPDATE risk_agg SET n = n - 1,
+    sentiment_sum = sentiment_sum - OLD.sentiment,
+    keywords_sum = keywords_sum - OLD.keywords,
+    source_sum = source_sum - OLD.source_weight
+  WHERE version = OLD.version
+    AND region = COALESCE((SELECT region FROM news WHERE url = OLD.url), 'Global')
+    AND category = COALESCE((SELECT category FROM news WHERE url = OLD.url), 'Geral')
+    AND bucket = CAST(OLD.published_ts / 3600 AS INTEGER);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_scores_agg_update AFTER UPDATE OF sentiment, keywords, source_weight, published_ts ON scores
+BEGIN
+  UPDATE risk_agg SET n = n - 1,
+    sentiment_sum = sentiment_sum - OLD.sentiment,
+    keywords_sum = keywords_sum - OLD.keywords,
+    source_sum = source_sum - OLD.source_weight
+  WHERE version = OLD.version
+    AND region = COALESCE((SELECT region FROM news WHERE url = OLD.url), 'Global')
+    AND category = COALESCE((SELECT category FROM news WHERE url = OLD.url), 'Geral')
+    AND bucket = CAST(OLD.published_ts / 3600 AS INTEGER);
+  INSERT INTO risk_agg(version, region, category, bucket, n, sentiment_sum, keywords_sum, source_sum)
+  VALUES(NEW.version,
+         COALESCE((SELECT region FROM news WHERE url = NEW.url), 'Global'),
+         COALESCE((SELECT category FROM news WHERE url = NEW.url), 'Geral'),
+         CAST(NEW.published_ts / 3600 AS INTEGER), 1,
+         NEW.sentiment, NEW.keywords, NEW.source_weight)
+  ON CONFLICT(version, region, category, bucket) DO UPDATE SET
+    n = n + 1,
+    sentiment_sum = sentiment_sum + excluded.sentiment_sum,
+    keywords_sum = keywords_sum + excluded.keywords_sum,
+    source_sum = source_sum + excluded.source_sum;
+END;
+"""
+
+ACTIVE_VERSION_KEY = "active_score_version"
+
+# última execução da retenção (infra/retention.py); semeada na criação do banco
+RETENTION_LAST_RUN_KEY = "retention_last_run"
+
+# contador incrementado a cada escrita visível (news/scores/versão ativa/retenção);
+# leitores (API, dashboard) invalidam caches comparando só este valor
+DATA_VERSION_KEY = "data_version"
+
+# quantos scores (mais recentes por publicação) entram no risco global
+GLOBAL_RISK_WINDOW = 60
+
+# versão resolvida dentro da própria query: a pedida (1º parâmetro, por sessão do
+# dashboard) ou, se None, a ativa em meta; trocar a ativa é um único UPDATE
+_VERSION_SQL = f"COALESCE(?, (SELECT value FROM meta WHERE key = '{ACTIVE_VERSION_KEY}'), ?)"
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
+
 class SQLiteRepo:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, compress_summaries: Optional[bool] = None):
         self.db_path = db_path
+        # resumos sem HTML e comprimidos (zlib + dicionário); leitura é transparente
+        self.compress_summaries = (_env_flag("DOOMSDAY_COMPRESS_SUMMARIES")
+                                   if compress_summaries is None else compress_summaries)
+        self._codec: Optional[SummaryCodec] = None
         self._init()
 
     def _conn(self):
-        return sqlite3.connect(self.db_path)
+        # timeout alto: vários workers/processos escrevem no mesmo arquivo
+        con = sqlite3.connect(self.db_path, timeout=30)
+        self._install_functions(con)
+        return con
+
+    def _install_functions(self, con) -> None:
+        # summary_text(summary, summary_z): texto do resumo, comprimido ou não
+        con.create_function("summary_text", 2, self._summary_text, deterministic=True)
 
     def _init(self):
         with self._conn() as con:
+            # WAL: leitores (dashboard) não bloqueiam o writer e vice-versa
+            con.execute("PRAGMA journal_mode=WAL")
             con.executescript(SCHEMA)
+            self._migrate(con)
+            con.executescript(INDEXES)
+
+    @staticmethod
+    def _canonicalize_urls(con) -> int:
+        """Reescreve news/scores/score_queue.url na forma canônica; variantes repetidas viram uma."""
+        changed = 0
+        urls = [r[0] for r in con.execute(
+            "SELECT url FROM news UNION SELECT url FROM scores UNION SELECT url FROM score_queue"
+        )]
+        for raw in urls:
+            canon = canonicalize_url(raw)
+            if not canon or canon == raw:
+                continue
+            changed += 1
+            if con.execute("SELECT 1 FROM news WHERE url = ?", (canon,)).fetchone():
+                # a forma canônica já existe: a variante é duplicata (scores antes de news, pelo trigger)
+                con.execute("DELETE FROM scores WHERE url = ?", (raw,))
+                con.execute("DELETE FROM score_queue WHERE url = ?", (raw,))
+                con.execute("DELETE FROM news WHERE url = ?", (raw,))
+                continue
+            # conflitos com linhas órfãs já canônicas saem antes de renomear a notícia:
+            # o trigger de delete acha a região/categoria pela url em news
+            con.execute(
+                "DELETE FROM scores WHERE url = ? AND version IN (SELECT version FROM scores WHERE url = ?)",
+                (raw, canon)
+            )
+            con.execute(
+                "DELETE FROM score_queue WHERE url = ? AND EXISTS (SELECT 1 FROM score_queue WHERE url = ?)",
+                (raw, canon)
+            )
+            con.execute("UPDATE news SET url = ? WHERE url = ?", (canon, raw))
+            con.execute("UPDATE scores SET url = ? WHERE url = ?", (canon, raw))
+            con.execute("UPDATE score_queue SET url = ? WHERE url = ?", (canon, raw))
+        return changed
+
+    @staticmethod
+    def _columns(con, table: str) -> List[str]:
+        return [r[1] for r in con.execute(f"PRAGMA table_info({table})")]
+
+    def _migrate(self, con):
+        # bancos antigos: scores sem published_ts -> copia de news.published_at
+        if "published_ts" not in self._columns(con, "scores"):
+            con.execute("ALTER TABLE scores ADD COLUMN published_ts REAL NOT NULL DEFAULT 0")
+            con.execute(
+                """UPDATE scores SET published_ts = COALESCE(
+                       (SELECT CAST(strftime('%s', n.published_at) AS REAL)
+                        FROM news n WHERE n.url = scores.url), 0)"""
+            )
+        # bancos antigos: scores com PK só em url -> PK (url, version)
+        if "version" not in self._columns(con, "scores"):
+            con.execute("DROP INDEX IF EXISTS idx_scores_published")
+            con.execute("ALTER TABLE scores RENAME TO scores_old")
+            con.executescript(SCHEMA)
+            con.execute(
+                """INSERT INTO scores(url, version, sentiment, keywords, source_weight, recency,
+                                      final, label, calculated_at, published_ts)
+                   SELECT url, 'v1', sentiment, keywords, source_weight, recency,
+                          final, label, calculated_at, published_ts
+                   FROM scores_old"""
+            )
+            con.execute("DROP TABLE scores_old")
+            self._register_version(con, "v1", None)
+        if "summary_z" not in self._columns(con, "news"):
+            con.execute("ALTER TABLE news ADD COLUMN summary_z BLOB")
+        if "archived_n" not in self._columns(con, "risk_vs_official"):
+            # série antiga agrupava por calculated_at: refeita por dia de publicação
+            con.execute("DROP TABLE risk_vs_official")
+            con.execute("DELETE FROM meta WHERE key LIKE 'risk_vs_official:%'")
+            con.executescript(SCHEMA)
+        if "sentiment_sum" not in self._columns(con, "risk_agg"):
+            # agregados antigos somavam o final (recência congelada): refeitos por componente
+            for trg in ("insert", "delete", "update"):
+                con.execute(f"DROP TRIGGER IF EXISTS trg_scores_agg_{trg}")
+            con.execute("DROP TABLE risk_agg")
+            con.execute("DELETE FROM meta WHERE key = 'risk_agg_seeded'")
+            con.executescript(SCHEMA)
+        if "keywords" not in self._columns(con, "score_versions"):
+            con.execute("ALTER TABLE score_versions ADD COLUMN keywords TEXT")
+            con.execute("ALTER TABLE score_versions ADD COLUMN sources TEXT")
+        if "region" not in self._columns(con, "news"):
+            con.execute(f"ALTER TABLE news ADD COLUMN region TEXT NOT NULL DEFAULT '{DEFAULT_REGION}'")
+            con.executemany("UPDATE news SET region = ? WHERE source = ?",
+                            [(region, source) for source, region in SOURCE_REGIONS.items()])
+        con.commit()
+        con.execute("BEGIN IMMEDIATE")  # vários processos podem abrir o banco ao mesmo tempo
+        if con.execute("SELECT 1 FROM meta WHERE key = 'risk_agg_seeded'").fetchone() is None:
+            # bancos antigos: agregados iniciais a partir dos scores existentes
+            con.execute(
+                """INSERT INTO risk_agg(version, region, category, bucket, n,
+                                        sentiment_sum, keywords_sum, source_sum)
+                   SELECT s.version, COALESCE(n.region, 'Global'), COALESCE(n.category, 'Geral'),
+                          CAST(s.published_ts / 3600 AS INTEGER), COUNT(*),
+                          SUM(s.sentiment), SUM(s.keywords), SUM(s.source_weight)
+                   FROM scores s LEFT JOIN news n ON n.url = s.url
+                   GROUP BY 1, 2, 3, 4"""
+            )
+            con.execute("INSERT INTO meta(key, value) VALUES('risk_agg_seeded', '1')")
+        if con.execute("SELECT 1 FROM meta WHERE key = 'score_queue_seeded'").fetchone() is None:
+            # bancos antigos: notícias que nunca ganharam score (ex.: crash no meio) voltam à fila
+            con.execute(
+                """INSERT OR IGNORE INTO score_queue(url, enqueued_at)
+                   SELECT url, ? FROM news WHERE url NOT IN (SELECT url FROM scores)""",
+                (time.time(),)
+            )
+            con.execute("INSERT INTO meta(key, value) VALUES('score_queue_seeded', '1')")
+        if con.execute("SELECT 1 FROM meta WHERE key = 'urls_canonical'").fetchone() is None:
+            # bancos antigos: urls gravadas antes da canonicalização -> forma canônica
+            # (a de-duplicação compara só urls canônicas)
+            if self._canonicalize_urls(con):
+                self._bump_data_version(con)
+            con.execute("INSERT INTO meta(key, value) VALUES('urls_canonical', '1')")
+        # bancos antigos: só há scores v1 -> leitores ficam na v1 até o backfill --activate
+        # (senão o dashboard leria uma SCORING_VERSION ainda vazia); o pipeline segue
+        # gravando na SCORING_VERSION
+        con.execute(
+            """INSERT OR IGNORE INTO meta(key, value)
+               SELECT ?, 'v1'
+               WHERE EXISTS (SELECT 1 FROM scores WHERE version = 'v1')
+                 AND NOT EXISTS (SELECT 1 FROM scores WHERE version = ?)""",
+            (ACTIVE_VERSION_KEY, SCORING_VERSION)
+        )
+        # primeira retenção só após um intervalo completo (não no primeiro refresh do dashboard)
+        con.execute("INSERT OR IGNORE INTO meta(key, value) VALUES(?, ?)",
+                    (RETENTION_LAST_RUN_KEY, str(time.time())))
+        con.commit()
+        if "version" not in self._columns(con, "risk_rollup"):
+            con.execute("ALTER TABLE risk_rollup RENAME TO risk_rollup_old")
+            con.executescript(SCHEMA)
+            con.execute(
+                """INSERT INTO risk_rollup(version, ts_minute, risk_sum, n)
+                   SELECT 'v1', ts_minute, risk_sum, n FROM risk_rollup_old"""
+            )
+            con.execute("DROP TABLE risk_rollup_old")
 
     def upsert_news(self, items: Iterable[NewsItem]) -> int:
-        rows = 0
-        with self._conn() as con:
-            for it in items:
-                if not it.url:
-                    continue
-                con.execute(
-                    """INSERT OR REPLACE INTO news(url, source, title, summary, category, published_at)
-                       VALUES(?,?,?,?,?,?)""",
-                    (it.url, it.source, it.title, it.summary, it.category, it.published_at.isoformat())
-                )
-                rows += 1
-        return rows
+        # aceita NewsBatch (colunar) ou qualquer iterável de NewsItem
+        rows = list(NewsBatch.from_items(items).db_rows())
+        if self.compress_summaries:
+            codec = self.summary_codec()
+            rows = [(*r[:3], "", *r[4:], codec.encode(strip_html(r[3]))) for r in rows]
+        else:
+            rows = [(*r, None) for r in rows]
+        with self._conn() as con:
+            con.executemany(
+                """INSERT OR REPLACE INTO news(url, source, title, summary, category, published_at,
+                                               region, summary_z)
+                   VALUES(?,?,?,?,?,?,?,?)""",
+                rows
+            )
+            # mesma transação: notícia gravada => notícia na fila de scoring
+            now = time.time()
+            con.executemany(
+                "INSERT OR IGNORE INTO score_queue(url, enqueued_at) VALUES(?, ?)",
+                [(r[0], now) for r in rows]
+            )
+            if rows:
+                self._bump_data_version(con)
+        return len(rows)
 
-    def upsert_scores(self, scores: Iterable[ThreatScore]) -> int:
-        rows = 0
+    def upsert_scores(self, scores: Iterable[ThreatScore],
+                      version: str = SCORING_VERSION,
+                      cfg: Optional[ScoringConfig] = None,
+                      keywords: Optional[Dict[str, float]] = None,
+                      sources: Optional[Dict[str, float]] = None) -> int:
+        # aceita ScoreBatch (colunar) ou qualquer iterável de ThreatScore
         now = datetime.utcnow().isoformat()
+        rows = list(ScoreBatch.from_scores(scores).db_rows(version, now))
+        with self._conn() as con:
+            self._register_version(con, version, cfg, keywords, sources)
+            # upsert (e não REPLACE) para o trigger de UPDATE manter o risk_agg
+            con.executemany(
+                """INSERT INTO scores(url, version, sentiment, keywords, source_weight, recency,
+                                      final, label, calculated_at, published_ts)
+                   VALUES(?,?,?,?,?,?,?,?,?,?)
+                   ON CONFLICT(url, version) DO UPDATE SET
+                     sentiment = excluded.sentiment, keywords = excluded.keywords,
+                     source_weight = excluded.source_weight, recency = excluded.recency,
+                     final = excluded.final, label = excluded.label,
+                     calculated_at = excluded.calculated_at, published_ts = excluded.published_ts""",
+                rows
+            )
+            if rows:
+                self._bump_data_version(con)
+        return len(rows)
+
+    @staticmethod
+    def _bump_data_version(con) -> None:
+        con.execute(
+            """INSERT INTO meta(key, value) VALUES(?, '1')
+               ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1""",
+            (DATA_VERSION_KEY,)
+        )
+
+    def data_version(self) -> int:
+        """Muda sempre que algo exibível muda; barato o bastante para checar por request."""
+        return int(self.get_meta(DATA_VERSION_KEY, "0"))
+
+    @staticmethod
+    def _register_version(con, version: str, cfg: Optional[ScoringConfig],
+                          keywords: Optional[Dict[str, float]] = None,
+                          sources: Optional[Dict[str, float]] = None) -> None:
+        # cfg None: só garante a linha (spec padrão); com cfg grava a spec inteira
+        if cfg is None:
+            con.execute(
+                "INSERT OR IGNORE INTO score_versions(version, config, created_at) VALUES(?, ?, ?)",
+                (version, json.dumps(asdict(ScoringConfig())), datetime.utcnow().isoformat())
+            )
+        else:
+            con.execute(
+                """INSERT INTO score_versions(version, config, created_at, keywords, sources)
+                   VALUES(?, ?, ?, ?, ?)
+                   ON CONFLICT(version) DO UPDATE SET config = excluded.config,
+                     keywords = excluded.keywords, sources = excluded.sources""",
+                (version, json.dumps(asdict(cfg)), datetime.utcnow().isoformat(),
+                 json.dumps(keywords) if keywords is not None else None,
+                 json.dumps(sources) if sources is not None else None)
+            )
+
+    def active_version(self) -> str:
+        return self.get_meta(ACTIVE_VERSION_KEY, SCORING_VERSION)
+
+    def set_active_version(self, version: str) -> None:
+        # troca atômica: todas as leituras resolvem a versão na própria query
+        with self._conn() as con:
+            con.execute("INSERT OR REPLACE INTO meta(key, value) VALUES(?, ?)",
+                        (ACTIVE_VERSION_KEY, version))
+            self._bump_data_version(con)
+
+    def list_versions(self) -> List[str]:
+        with self._conn() as con:
+            cur = con.execute("SELECT version FROM score_versions ORDER BY created_at")
+            return [r[0] for r in cur.fetchall()]
+
+    def version_config(self, version: Optional[str] = None) -> ScoringConfig:
+        version = version or self.active_version()
+        with self._conn() as con:
+            row = con.execute(
+                "SELECT config FROM score_versions WHERE version = ?", (version,)
+            ).fetchone()
+        if not row:
+            return ScoringConfig()
+        return ScoringConfig(**json.loads(row[0]))
+
+    def version_spec(self, version: Optional[str] = None
+                     ) -> Tuple[ScoringConfig, Dict[str, float], Dict[str, float]]:
+        """(cfg, keywords, sources) gravados com a versão; o que faltar vem do código."""
+        version = version or self.active_version()
+        with self._conn() as con:
+            row = con.execute(
+                "SELECT config, keywords, sources FROM score_versions WHERE version = ?", (version,)
+            ).fetchone()
+        if not row:
+            return ScoringConfig(), DEFAULT_KEYWORDS, DEFAULT_SOURCE_WEIGHTS
+        return (ScoringConfig(**json.loads(row[0])),
+                json.loads(row[1]) if row[1] else DEFAULT_KEYWORDS,
+                json.loads(row[2]) if row[2] else DEFAULT_SOURCE_WEIGHTS)
+
+    def fetch_unscored_news(self, version: str, limit: int = 500) -> NewsBatch:
+        """Notícias sem score na versão (ex.: gravadas durante um backfill)."""
+        with self._conn() as con:
+            cur = con.execute(
+                """SELECT source, title, summary_text(summary, summary_z), url, published_at, category, region
+                   FROM news n
+                   WHERE NOT EXISTS (SELECT 1 FROM scores s WHERE s.url = n.url AND s.version = ?)
+                   ORDER BY url
+                   LIMIT ?""",
+                (version, limit)
+            )
+            batch = NewsBatch()
+            for r in cur:
+                batch.append(r[0], r[1], r[2], r[3], to_epoch(datetime.fromisoformat(r[4])), r[5], r[6])
+            return batch
+
+    def iter_urls(self, after_rowid: int = 0) -> Iterator[Tuple[int, str]]:
+        """(rowid, url) das notícias gravadas depois de after_rowid, em ordem de inserção."""
+        con = self._conn()
+        try:
+            yield from con.execute(
+                "SELECT rowid, url FROM news WHERE rowid > ? ORDER BY rowid", (after_rowid,)
+            )
+        finally:
+            con.close()
+
+    def has_url(self, url: str) -> bool:
         with self._conn() as con:
-            for sc in scores:
-                con.execute(
-                    """INSERT OR REPLACE INTO scores(url, sentiment, keywords, source_weight, recency, final, label, calculated_at)
-                       VALUES(?,?,?,?,?,?,?,?)""",
-                    (sc.item_url, sc.sentiment, sc.keywords, sc.source_weight, sc.recency, sc.final, sc.label, now)
+            return con.execute("SELECT 1 FROM news WHERE url = ?", (url,)).fetchone() is not None
+
+    def fetch_news_after(self, after_url: str = "", limit: int = 500) -> NewsBatch:
+        # leitura em blocos (keyset por url) para backfills, direto em colunas
+        with self._conn() as con:
+            cur = con.execute(
+                """SELECT source, title, summary_text(summary, summary_z), url, published_at, category, region
+                   FROM news
+                   WHERE url > ?
+                   ORDER BY url
+                   LIMIT ?""",
+                (after_url, limit)
+            )
+            batch = NewsBatch()
+            for r in cur:
+                batch.append(r[0], r[1], r[2], r[3], to_epoch(datetime.fromisoformat(r[4])), r[5], r[6])
+            return batch
+
+    # ---------------------------
+    # Fila de scoring
+    # ---------------------------
+    def dequeue_news(self, worker_id: str, limit: int = 200, lease_s: float = 300,
+                     max_attempts: int = 5, now: Optional[float] = None) -> NewsBatch:
+        """Aluga até `limit` notícias prontas (mais antigas primeiro) por lease_s segundos."""
+        now = time.time() if now is None else now
+        con = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        self._install_functions(con)
+        try:
+            con.execute("BEGIN IMMEDIATE")  # dois workers nunca alugam a mesma url
+            try:
+                urls = [r[0] for r in con.execute(
+                    """SELECT url FROM score_queue
+                       WHERE lease_until < ? AND attempts < ?
+                       ORDER BY enqueued_at
+                       LIMIT ?""",
+                    (now, max_attempts, limit)
+                )]
+                con.executemany(
+                    """UPDATE score_queue SET lease_owner = ?, lease_until = ?, attempts = attempts + 1
+                       WHERE url = ?""",
+                    [(worker_id, now + lease_s, u) for u in urls]
+                )
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+
+            batch = NewsBatch()
+            for i in range(0, len(urls), 500):
+                part = urls[i:i + 500]
+                cur = con.execute(
+                    f"""SELECT source, title, summary_text(summary, summary_z), url, published_at,
+                               category, region
+                        FROM news WHERE url IN ({",".join("?" * len(part))})""",
+                    part
                 )
-                rows += 1
-        return rows
+                for r in cur:
+                    batch.append(r[0], r[1], r[2], r[3], to_epoch(datetime.fromisoformat(r[4])), r[5], r[6])
+            return batch
+        finally:
+            con.close()
+
+    def ack_news(self, worker_id: str, urls: Iterable[str]) -> None:
+        """Remove da fila o que este worker pontuou (lease ainda dele)."""
+        with self._conn() as con:
+            con.executemany(
+                "DELETE FROM score_queue WHERE url = ? AND lease_owner = ?",
+                [(u, worker_id) for u in urls]
+            )
+
+    def nack_news(self, worker_id: str, urls: Iterable[str], error: str,
+                  retry_base_s: float = 30.0, now: Optional[float] = None) -> None:
+        """Devolve à fila com backoff exponencial por tentativa."""
+        now = time.time() if now is None else now
+        with self._conn() as con:
+            con.executemany(
+                """UPDATE score_queue
+                   SET lease_owner = NULL, last_error = ?,
+                       lease_until = ? + ? * (1 << MIN(attempts, 10))
+                   WHERE url = ? AND lease_owner = ?""",
+                [(str(error)[:500], now, retry_base_s, u, worker_id) for u in urls]
+            )
+
+    def queue_stats(self, max_attempts: int = 5, now: Optional[float] = None) -> dict:
+        """Profundidade da fila (sinal de backpressure para a coleta)."""
+        now = time.time() if now is None else now
+        with self._conn() as con:
+            ready, leased, retrying, dead = con.execute(
+                """SELECT COALESCE(SUM(attempts < ? AND lease_until < ?), 0),
+                          COALESCE(SUM(attempts < ? AND lease_until >= ? AND lease_owner IS NOT NULL), 0),
+                          COALESCE(SUM(attempts < ? AND lease_until >= ? AND lease_owner IS NULL), 0),
+                          COALESCE(SUM(attempts >= ?), 0)
+                   FROM score_queue""",
+                (max_attempts, now, max_attempts, now, max_attempts, now, max_attempts)
+            ).fetchone()
+        return {"ready": ready, "leased": leased, "retrying": retrying, "dead": dead}
+
+    def queue_depth(self, max_attempts: int = 5) -> int:
+        st = self.queue_stats(max_attempts)
+        return st["ready"] + st["leased"] + st["retrying"]
 
-    def fetch_latest(self, limit: int = 40) -> List[Tuple]:
+    def fetch_latest(self, limit: int = 40, version: Optional[str] = None) -> List[Tuple]:
         with self._conn() as con:
             cur = con.execute(
-                """SELECT n.source, n.category,n.title, n.url, n.published_at,
-                          s.final, s.label, n.summary
+                f"""SELECT n.source, n.category,n.title, n.url, n.published_at,
+                          s.final, s.label, summary_text(n.summary, n.summary_z)
                    FROM news n
-                   LEFT JOIN scores s ON s.url = n.url
+                   LEFT JOIN scores s ON s.url = n.url AND s.version = {_VERSION_SQL}
                    ORDER BY n.published_at DESC
                    LIMIT ?""",
-                (limit,)
+                (version, SCORING_VERSION, limit)
             )
             return cur.fetchall()
 
-    def fetch_global_risk(self) -> float:
-        # risco global = média ponderada dos top N scores (mais recentes)
+    def search_news(self, text: str, limit: int = 100, version: Optional[str] = None) -> List[Tuple]:
+        """Busca (LIKE, sem distinção de maiúsculas ASCII) em título e resumo; colunas de fetch_latest."""
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
         with self._conn() as con:
             cur = con.execute(
-                """SELECT final FROM scores
-                   ORDER BY calculated_at DESC
-                   LIMIT 60"""
+                f"""SELECT n.source, n.category,n.title, n.url, n.published_at,
+                          s.final, s.label, summary_text(n.summary, n.summary_z)
+                   FROM news n
+                   LEFT JOIN scores s ON s.url = n.url AND s.version = {_VERSION_SQL}
+                   WHERE n.title LIKE ? ESCAPE '\\'
+                      OR summary_text(n.summary, n.summary_z) LIKE ? ESCAPE '\\'
+                   ORDER BY n.published_at DESC
+                   LIMIT ?""",
+                (version, SCORING_VERSION, pattern, pattern, limit)
             )
-            vals = [r[0] for r in cur.fetchall() if r[0] is not None]
-        if not vals:
+            return cur.fetchall()
+
+    def fetch_global_risk(self, cfg: Optional[ScoringConfig] = None,
+                          now: Optional[float] = None, window: int = GLOBAL_RISK_WINDOW,
+                          version: Optional[str] = None) -> float:
+        # risco global = média dos N scores mais recentes (por publicação),
+        # com a recência recalculada agora (decay contínuo, sem re-score)
+        now = time.time() if now is None else now
+        version = version or self.active_version()
+        cfg = cfg or self.version_config(version)
+        with self._conn() as con:
+            con.create_function("recency_decay", 1, recency_decay, deterministic=True)
+            cur = con.execute(
+                """SELECT AVG(MIN(1.0, MAX(0.0,
+                              sentiment * ? + keywords * ? + source_weight * ?
+                              + recency_decay((? - published_ts) / 3600.0) * ?)))
+                   FROM (SELECT sentiment, keywords, source_weight, published_ts
+                         FROM scores
+                         WHERE version = ?
+                         ORDER BY published_ts DESC
+                         LIMIT ?)""",
+                (cfg.w_sentiment, cfg.w_keywords, cfg.w_source, now, cfg.w_recency, version, window)
+            )
+            val = cur.fetchone()[0]
+        if val is None:
             return 0.35
-        return sum(vals) / len(vals)
-    
-    def fetch_risk_history(self, limit: int = 500):
+        return float(val)
+
+    def fetch_score_components(self, version: Optional[str] = None,
+                               now: Optional[float] = None) -> List[Tuple[float, float, float, float]]:
+        """
+        (sentiment, keywords, source_weight, recency decaída agora) de todos os
+        scores da versão, do mais recente para o mais antigo.
+        """
+        now = time.time() if now is None else now
+        version = version or self.active_version()
+        with self._conn() as con:
+            con.create_function("recency_decay", 1, recency_decay, deterministic=True)
+            cur = con.execute(
+                """SELECT sentiment, keywords, source_weight,
+                          recency_decay((? - published_ts) / 3600.0)
+                   FROM scores
+                   WHERE version = ?
+                   ORDER BY published_ts DESC""",
+                (now, version)
+            )
+            return cur.fetchall()
 
+    def fetch_risk_history(self, limit: int = 500, version: Optional[str] = None):
+        # scores vivos + rollups do que já foi arquivado pela retenção
         with self._conn() as con:
-            cur = con.execute("""
-                SELECT substr(calculated_at, 1, 16) as ts_minute,
-                       AVG(final) as risk_avg
-                FROM scores
+            cur = con.execute(f"""
+                SELECT ts_minute, SUM(risk_sum) / SUM(n) AS risk_avg
+                FROM (
+                    SELECT substr(calculated_at, 1, 16) AS ts_minute,
+                           SUM(final) AS risk_sum, COUNT(*) AS n
+                    FROM scores
+                    WHERE version = {_VERSION_SQL}
+                    GROUP BY ts_minute
+                    UNION ALL
+                    SELECT ts_minute, risk_sum, n FROM risk_rollup
+                    WHERE version = {_VERSION_SQL}
+                )
                 GROUP BY ts_minute
                 ORDER BY ts_minute ASC
                 LIMIT ?
-            """, (limit,))
-            return cur.fetchall()    
-    
+            """, (version, SCORING_VERSION, version, SCORING_VERSION, limit))
+            return cur.fetchall()
+
+    # ---------------------------
+    # Timeline oficial x modelo
+    # ---------------------------
+    def save_official_timeline(self, points: Iterable[TimelinePoint]) -> int:
+        """Grava os pontos oficiais e refaz o as-of da série comparativa (poucas linhas por dia)."""
+        rows = [(p.year, p.seconds_to_midnight, time.time()) for p in points]
+        with self._conn() as con:
+            con.executemany(
+                """INSERT OR REPLACE INTO official_timeline(year, seconds_to_midnight, fetched_at)
+                   VALUES(?, ?, ?)""",
+                rows
+            )
+            con.execute(
+                f"""UPDATE risk_vs_official
+                    SET (official_year, official_seconds) = ({self._ASOF_OFFICIAL_SQL})"""
+            )
+            if rows:
+                self._bump_data_version(con)
+        return len(rows)
+
+    def load_official_timeline(self) -> Tuple[List[TimelinePoint], Optional[float]]:
+        """(pontos por ano, instante da última gravação ou None se vazio)."""
+        with self._conn() as con:
+            rows = con.execute(
+                "SELECT year, seconds_to_midnight, fetched_at FROM official_timeline ORDER BY year"
+            ).fetchall()
+        return [TimelinePoint(y, sec) for y, sec, _ in rows], max((r[2] for r in rows), default=None)
+
+    # ponto oficial vigente no ano do dia (o último anúncio até aquele ano)
+    _ASOF_OFFICIAL_SQL = """
+        SELECT o.year, o.seconds_to_midnight FROM official_timeline o
+        WHERE o.year <= CAST(substr(risk_vs_official.day, 1, 4) AS INTEGER)
+        ORDER BY o.year DESC LIMIT 1"""
+
+    def refresh_risk_vs_official(self, version: Optional[str] = None) -> int:
+        """
+        Atualiza a série modelo x oficial da versão (padrão: ativa) de forma incremental:
+        só recalcula os dias de publicação com scores gravados desde a última
+        atualização (itens novos ou re-score). Devolve quantos dias foram (re)escritos.
+        """
+        with self._conn() as con:
+            con.execute("BEGIN IMMEDIATE")  # marca e dias lidos do mesmo estado
+            version = con.execute(f"SELECT {_VERSION_SQL}", (version, SCORING_VERSION)).fetchone()[0]
+            mark_key = f"risk_vs_official:{version}:calculated_at"
+            mark = con.execute("SELECT value FROM meta WHERE key = ?", (mark_key,)).fetchone()
+            new_mark = con.execute(
+                "SELECT MAX(calculated_at) FROM scores WHERE version = ?", (version,)
+            ).fetchone()[0]
+            days = con.execute(
+                """SELECT s.day, SUM(s.final), COUNT(*), COALESCE(r.archived_sum, 0), COALESCE(r.archived_n, 0)
+                   FROM (SELECT date(published_ts, 'unixepoch') AS day, final
+                         FROM scores WHERE version = ?) s
+                   LEFT JOIN risk_vs_official r ON r.version = ? AND r.day = s.day
+                   WHERE s.day IN (SELECT DISTINCT date(published_ts, 'unixepoch') FROM scores
+                                   WHERE version = ? AND calculated_at > ?)
+                   GROUP BY s.day""",
+                (version, version, version, mark[0] if mark else "")
+            ).fetchall()
+            # vivos + o que a retenção já arquivou daquele dia
+            rows = [(version, day, rs + ars, n + an, risk_to_minutes((rs + ars) / (n + an)))
+                    for day, rs, n, ars, an in days]
+            con.executemany(
+                """INSERT INTO risk_vs_official(version, day, risk_sum, n, model_minutes)
+                   VALUES(?, ?, ?, ?, ?)
+                   ON CONFLICT(version, day) DO UPDATE SET risk_sum = excluded.risk_sum,
+                     n = excluded.n, model_minutes = excluded.model_minutes""",
+                rows
+            )
+            con.executemany(
+                f"""UPDATE risk_vs_official
+                    SET (official_year, official_seconds) = ({self._ASOF_OFFICIAL_SQL})
+                    WHERE version = ? AND day = ?""",
+                [(version, r[1]) for r in rows]
+            )
+            if new_mark:
+                con.execute("INSERT OR REPLACE INTO meta(key, value) VALUES(?, ?)", (mark_key, new_mark))
+        return len(rows)
+
+    def fetch_risk_vs_official(self, version: Optional[str] = None) -> List[Tuple[str, float, float, Optional[int]]]:
+        """(dia, risco médio, minutos do modelo, segundos oficiais vigentes) da versão (padrão: ativa)."""
+        with self._conn() as con:
+            cur = con.execute(
+                f"""SELECT day, risk_sum / n, model_minutes, official_seconds
+                    FROM risk_vs_official
+                    WHERE version = {_VERSION_SQL}
+                    ORDER BY day""",
+                (version, SCORING_VERSION)
+            )
+            return cur.fetchall()
+
+    def fetch_risk_breakdown(self, hours: float = 72.0,
+                             now: Optional[float] = None,
+                             version: Optional[str] = None,
+                             cfg: Optional[ScoringConfig] = None) -> List[Tuple[str, str, int, float]]:
+        """
+        (região, categoria, n, risco médio) da versão (padrão: ativa) nas últimas `hours` horas,
+        com a recência decaída agora como no risco global (pelo meio da hora de cada bucket;
+        o clamp 0..1 vale para a média do bucket).
+        """
+        now = time.time() if now is None else now
+        version = version or self.active_version()
+        cfg = cfg or self.version_config(version)
+        since = int((now - hours * 3600) // 3600)
+        with self._conn() as con:
+            con.create_function("recency_decay", 1, recency_decay, deterministic=True)
+            cur = con.execute(
+                """SELECT region, category, SUM(n),
+                          SUM(n * MIN(1.0, MAX(0.0,
+                              (sentiment_sum * ? + keywords_sum * ? + source_sum * ?) / n
+                              + recency_decay((? - bucket * 3600 - 1800) / 3600.0) * ?))) / SUM(n)
+                   FROM risk_agg
+                   WHERE version = ? AND bucket >= ? AND n > 0
+                   GROUP BY region, category
+                   ORDER BY region, category""",
+                (cfg.w_sentiment, cfg.w_keywords, cfg.w_source, now, cfg.w_recency, version, since)
+            )
+            return cur.fetchall()
+
+    def save_dashboard_snapshot(self, scoring_version: str, data_version: int, payload: str) -> None:
+        with self._conn() as con:
+            con.execute(
+                """INSERT OR REPLACE INTO dashboard_snapshot(scoring_version, data_version, created_at, payload)
+                   VALUES(?, ?, ?, ?)""",
+                (scoring_version, data_version, time.time(), payload)
+            )
+
+    def load_dashboard_snapshot(self, scoring_version: Optional[str] = None) -> Optional[str]:
+        """JSON do snapshot da versão (padrão: a ativa) numa única leitura por chave."""
+        with self._conn() as con:
+            row = con.execute(
+                f"SELECT payload FROM dashboard_snapshot WHERE scoring_version = {_VERSION_SQL}",
+                (scoring_version, SCORING_VERSION)
+            ).fetchone()
+        return row[0] if row else None
+
+    # ---------------------------
+    # Resumos comprimidos
+    # ---------------------------
+    def summary_codec(self, reload: bool = False) -> SummaryCodec:
+        """Codec com todos os dicionários gravados; comprime com o mais novo."""
+        if self._codec is None or reload:
+            con = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                dicts = dict(con.execute("SELECT id, zdict FROM summary_dicts"))
+            finally:
+                con.close()
+            self._codec = SummaryCodec(dicts, max(dicts, default=0))
+        return self._codec
+
+    def _summary_text(self, summary: str, summary_z: Optional[bytes]) -> str:
+        if summary_z is None:
+            return summary
+        try:
+            return self.summary_codec().decode(summary_z)
+        except KeyError:
+            # dicionário treinado por outro processo depois do nosso load
+            return self.summary_codec(reload=True).decode(summary_z)
+
+    def train_summary_dict(self, sample_limit: int = 5000, min_samples: int = 200) -> Optional[int]:
+        """Treina um dicionário com os resumos mais recentes (sem HTML). None se há poucos."""
+        with self._conn() as con:
+            samples = [strip_html(r[0]) for r in con.execute(
+                """SELECT summary_text(summary, summary_z) FROM news
+                   ORDER BY published_at DESC LIMIT ?""",
+                (sample_limit,)
+            )]
+        samples = [t for t in samples if t]
+        if len(samples) < min_samples:
+            return None
+        zdict = train_zdict(samples)
+        with self._conn() as con:
+            cur = con.execute(
+                "INSERT INTO summary_dicts(zdict, samples, created_at) VALUES(?, ?, ?)",
+                (zdict, len(samples), time.time())
+            )
+            dict_id = cur.lastrowid
+        self.summary_codec(reload=True)
+        return dict_id
+
+    def compact_summaries(self, retrain: bool = False, batch: int = 500) -> dict:
+        """
+        Treina o dicionário (se ainda não há um, ou retrain) e comprime os
+        resumos ainda em texto puro, em lotes (transações curtas).
+        """
+        trained = None
+        if retrain or not self.summary_codec(reload=True).current:
+            trained = self.train_summary_dict()
+        codec = self.summary_codec()
+
+        rows = bytes_before = bytes_after = 0
+        while True:
+            with self._conn() as con:
+                part = con.execute(
+                    """SELECT rowid, summary FROM news
+                       WHERE summary_z IS NULL AND summary != '' LIMIT ?""",
+                    (batch,)
+                ).fetchall()
+                if not part:
+                    break
+                updates = []
+                for rowid, summary in part:
+                    blob = codec.encode(strip_html(summary))
+                    bytes_before += len(summary.encode("utf-8"))
+                    bytes_after += len(blob)
+                    updates.append((blob, rowid))
+                con.executemany("UPDATE news SET summary = '', summary_z = ? WHERE rowid = ?", updates)
+            rows += len(part)
+        return {"trained_dict": trained, "dict_id": codec.current, "compressed": rows,
+                "bytes_before": bytes_before, "bytes_after": bytes_after}
+
+    def get_meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self._conn() as con:
+            row = con.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._conn() as con:
+            con.execute("INSERT OR REPLACE INTO meta(key, value) VALUES(?, ?)", (key, value))
@@ -0,0 +1,212 @@
+# src/infra/retention.py
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from infra.repository import RETENTION_LAST_RUN_KEY, SQLiteRepo
+
+LAST_RUN_KEY = RETENTION_LAST_RUN_KEY
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    keep_days: int = 30               # linhas mais velhas vão para o arquivo
+    archive_dir: str = os.path.join("data", "archive")
+    interval_hours: float = 24.0      # frequência do maybe_run_retention
+    vacuum_pages: int = 2000          # páginas devolvidas por incremental_vacuum
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        """
+        Lê overrides do ambiente:
+          DOOMSDAY_RETENTION_DAYS, DOOMSDAY_ARCHIVE_DIR,
+          DOOMSDAY_RETENTION_INTERVAL_HOURS, DOOMSDAY_VACUUM_PAGES
+        """
+        d = cls()
+        return cls(
+            keep_days=int(os.getenv("DOOMSDAY_RETENTION_DAYS", d.keep_days)),
+            archive_dir=os.getenv("DOOMSDAY_ARCHIVE_DIR", d.archive_dir),
+            interval_hours=float(os.getenv("DOOMSDAY_RETENTION_INTERVAL_HOURS", d.interval_hours)),
+            vacuum_pages=int(os.getenv("DOOMSDAY_VACUUM_PAGES", d.vacuum_pages)),
+        )
+
+@dataclass(frozen=True)
+class RetentionReport:
+    archived_news: int
+    archived_scores: int
+    archive_path: Optional[str]
+    size_before: int                  # bytes
+    size_after: int
+    latency_before_ms: float          # leitura típica do dashboard
+    latency_after_ms: float
+    compressed_summaries: int = 0     # resumos convertidos para zlib + dicionário
+
+def _db_size(con: sqlite3.Connection) -> int:
+    page_count = con.execute("PRAGMA page_count").fetchone()[0]
+    page_size = con.execute("PRAGMA page_size").fetchone()[0]
+    return page_count * page_size
+
+def _probe_latency(repo: SQLiteRepo) -> float:
+    t0 = time.perf_counter()
+    repo.fetch_global_risk()
+    repo.fetch_latest(limit=40)
+    return (time.perf_counter() - t0) * 1000.0
+
+_SCORE_COLS = ("url", "version", "sentiment", "keywords", "source_weight", "recency",
+               "final", "label", "calculated_at", "published_ts")
+
+def _archive_rows(con: sqlite3.Connection, old_scores: str, params: dict, path: str):
+    news = 0
+    scores = 0
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        cur = con.execute(
+            """SELECT url, source, title, summary_text(summary, summary_z), category, published_at
+               FROM news
+               WHERE published_at < :iso""",
+            params
+        )
+        for r in cur:
+            rec = {"news": dict(zip(
+                ("url", "source", "title", "summary", "category", "published_at"), r))}
+            fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            news += 1
+
+        # todas as versões de score das notícias removidas + órfãos antigos
+        cur = con.execute(f"SELECT {', '.join(_SCORE_COLS)} FROM scores WHERE {old_scores}", params)
+        for r in cur:
+            fh.write(json.dumps({"score": dict(zip(_SCORE_COLS, r))}, ensure_ascii=False) + "\n")
+            scores += 1
+        fh.flush()
+        os.fsync(fh.fileno())
+    return news, scores
+
+def run_retention(repo: SQLiteRepo,
+                  policy: RetentionPolicy = RetentionPolicy(),
+                  now: Optional[float] = None,
+                  full_vacuum: bool = False) -> RetentionReport:
+    """
+    Move para um arquivo .jsonl.gz tudo que for mais velho que keep_days,
+    agrega os scores removidos em risk_rollup e em risk_vs_official (o histórico continua igual),
+    comprime resumos (se DOOMSDAY_COMPRESS_SUMMARIES) e faz incremental_vacuum + ANALYZE.
+    full_vacuum=True liga auto_vacuum=INCREMENTAL com um VACUUM completo (uma vez,
+    bloqueia o banco): só pela CLI, nunca no caminho do refresh.
+    """
+    now = time.time() if now is None else now
+    cutoff_ts = now - policy.keep_days * 86400
+    cutoff_iso = datetime.fromtimestamp(cutoff_ts, tz=timezone.utc).isoformat()
+
+    con = sqlite3.connect(repo.db_path, isolation_level=None)
+    repo._install_functions(con)  # summary_text() para arquivar resumos comprimidos
+    try:
+        size_before = _db_size(con)
+        latency_before = _probe_latency(repo)
+
+        # série modelo x oficial em dia antes de arquivar: os dias arquivados não são mais recalculados
+        for (version,) in con.execute("SELECT DISTINCT version FROM scores").fetchall():
+            repo.refresh_risk_vs_official(version=version)
+
+        stamp = datetime.fromtimestamp(now, tz=timezone.utc).strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(policy.archive_dir, f"doomsday-{stamp}.jsonl.gz")
+
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            old_scores = """url IN (SELECT url FROM news WHERE published_at < :iso)
+                            OR (published_ts < :ts AND url NOT IN (SELECT url FROM news))"""
+            params = {"iso": cutoff_iso, "ts": cutoff_ts}
+            archived_news, archived_scores = _archive_rows(con, old_scores, params, path)
+            con.execute(
+                f"""INSERT INTO risk_rollup(version, ts_minute, risk_sum, n)
+                    SELECT version, substr(calculated_at, 1, 16), SUM(final), COUNT(*)
+                    FROM scores
+                    WHERE {old_scores}
+                    GROUP BY 1, 2
+                    ON CONFLICT(version, ts_minute) DO UPDATE SET
+                      risk_sum = risk_sum + excluded.risk_sum,
+                      n = n + excluded.n""",
+                params
+            )
+            # o total do dia não muda; só passa a contar como arquivado
+            con.execute(
+                f"""UPDATE risk_vs_official
+                    SET archived_sum = archived_sum + a.risk_sum, archived_n = archived_n + a.n
+                    FROM (SELECT version, date(published_ts, 'unixepoch') AS day,
+                                 SUM(final) AS risk_sum, COUNT(*) AS n
+                          FROM scores WHERE {old_scores}
+                          GROUP BY 1, 2) AS a
+                    WHERE risk_vs_official.version = a.version AND risk_vs_official.day = a.day""",
+                params
+            )
+            con.execute(f"DELETE FROM scores WHERE {old_scores}", params)
+            con.execute("DELETE FROM news WHERE published_at < :iso", params)
+            con.execute("DELETE FROM score_queue WHERE url NOT IN (SELECT url FROM news)")
+            con.execute("DELETE FROM risk_agg WHERE n <= 0")
+            if archived_news or archived_scores:
+                SQLiteRepo._bump_data_version(con)
+            con.execute(
+                "INSERT OR REPLACE INTO meta(key, value) VALUES(?, ?)", (LAST_RUN_KEY, str(now))
+            )
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+
+        if archived_news == 0 and archived_scores == 0:
+            os.remove(path)
+            path = None
+
+        # resumos ainda em texto puro -> comprimidos (antes do vacuum, que devolve as páginas)
+        compressed = repo.compact_summaries()["compressed"] if repo.compress_summaries else 0
+
+        # auto_vacuum=INCREMENTAL só vale após um VACUUM completo (feito uma vez, pela CLI)
+        if full_vacuum and con.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            con.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            con.execute("VACUUM")
+        con.execute(f"PRAGMA incremental_vacuum({int(policy.vacuum_pages)})")
+        con.execute("ANALYZE")
+        con.execute("PRAGMA optimize")
+
+        size_after = _db_size(con)
+    finally:
+        con.close()
+
+    return RetentionReport(
+        archived_news=archived_news,
+        archived_scores=archived_scores,
+        archive_path=path,
+        size_before=size_before,
+        size_after=size_after,
+        latency_before_ms=latency_before,
+        latency_after_ms=_probe_latency(repo),
+        compressed_summaries=compressed,
+    )
+
+def retention_due(repo: SQLiteRepo,
+                  policy: RetentionPolicy = RetentionPolicy(),
+                  now: Optional[float] = None) -> bool:
+    """A última execução foi há mais de interval_hours? (uma leitura em meta)"""
+    now = time.time() if now is None else now
+    return now - float(repo.get_meta(LAST_RUN_KEY, "0")) >= policy.interval_hours * 3600
+
+def maybe_run_retention(repo: SQLiteRepo,
+                        policy: RetentionPolicy = RetentionPolicy(),
+                        now: Optional[float] = None) -> Optional[RetentionReport]:
+    """Roda a retenção se a última execução foi há mais de interval_hours."""
+    now = time.time() if now is None else now
+    if not retention_due(repo, policy, now):
+        return None
+    return run_retention(repo, policy, now=now)
+
+if __name__ == "__main__":
+    # python -m infra.retention [db_path]   (a partir de src/)
+    import sys
+
+    db = sys.argv[1] if len(sys.argv) > 1 else os.path.join("data", "doomsday.db")
+    report = run_retention(SQLiteRepo(db), RetentionPolicy.from_env(), full_vacuum=True)
+    print(json.dumps(asdict(report), indent=2))
@@ -0,0 +1,98 @@
+# src/infra/single_flight.py
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS flight_lock (
+  name TEXT PRIMARY KEY,
+  owner TEXT,
+  lease_until REAL NOT NULL DEFAULT 0,
+  finished_at REAL NOT NULL DEFAULT 0,
+  result TEXT
+);
+"""
+
+def _owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+class SingleFlight:
+    """
+    Single-flight entre sessões/processos/réplicas que dividem o mesmo SQLite:
+    por nome, só um dono com lease executa; os outros esperam e reaproveitam o
+    resultado (JSON) que ele gravou. Lease vencido (dono morreu) libera a vez.
+    """
+
+    def __init__(self, db_path: str, poll_s: float = 0.25):
+        self.db_path = db_path
+        self.poll_s = poll_s
+        with self._conn() as con:
+            con.executescript(SCHEMA)
+
+    def _conn(self):
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _acquire(self, con, name: str, owner: str, lease_s: float, fresh_after: float) -> bool:
+        # atômico: só pega se ninguém tem lease válido e nenhum voo terminou depois de fresh_after
+        now = time.time()
+        cur = con.execute(
+            """INSERT INTO flight_lock(name, owner, lease_until) VALUES(?, ?, ?)
+               ON CONFLICT(name) DO UPDATE
+               SET owner = excluded.owner, lease_until = excluded.lease_until
+               WHERE flight_lock.lease_until < ? AND flight_lock.finished_at < ?""",
+            (name, owner, now + lease_s, now, fresh_after)
+        )
+        return cur.rowcount > 0
+
+    def _finished(self, con, name: str, fresh_after: float) -> Optional[Dict]:
+        row = con.execute(
+            "SELECT result FROM flight_lock WHERE name = ? AND finished_at >= ?",
+            (name, fresh_after)
+        ).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def run(self, name: str, fn: Callable[[], Dict], lease_s: float, wait_s: float,
+            reuse_s: float = 0.0) -> Tuple[Optional[Dict], bool]:
+        """
+        Executa fn() se conseguir o lock; senão espera até wait_s pelo voo em
+        andamento. Resultado de voo terminado há menos de reuse_s também vale.
+        Devolve (resultado, executou_aqui); (None, False) se a espera estourou.
+        """
+        owner = _owner_id()
+        fresh_after = time.time() - reuse_s
+        give_up = time.monotonic() + wait_s
+        con = self._conn()
+        try:
+            while True:
+                if self._acquire(con, name, owner, lease_s, fresh_after):
+                    break
+                result = self._finished(con, name, fresh_after)
+                if result is not None:
+                    return result, False
+                if time.monotonic() >= give_up:
+                    return None, False
+                time.sleep(self.poll_s)
+
+            try:
+                result = fn()
+            except Exception:
+                # falhou: libera sem resultado, quem está esperando assume
+                con.execute(
+                    "UPDATE flight_lock SET owner = NULL, lease_until = 0 WHERE name = ? AND owner = ?",
+                    (name, owner)
+                )
+                raise
+            con.execute(
+                """UPDATE flight_lock SET owner = NULL, lease_until = 0, finished_at = ?, result = ?
+                   WHERE name = ? AND owner = ?""",
+                (time.time(), json.dumps(result, ensure_ascii=False), name, owner)
+            )
+            return result, True
+        finally:
+            con.close()
@@ -0,0 +1,129 @@
+# src/infra/source_registry.py
+from __future__ import annotations
+
+import sqlite3
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from infra.source_scheduler import SCHEMA as SCHEDULER_SCHEMA
+from infra.sources import DEFAULT_REGION, load_sources
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+  name TEXT PRIMARY KEY,
+  url TEXT NOT NULL,
+  region TEXT NOT NULL DEFAULT 'Global',
+  enabled INTEGER NOT NULL DEFAULT 1,
+  lease_owner TEXT,
+  lease_until REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sources_lease ON sources(enabled, lease_until);
+"""
+
+Source = Tuple[str, str, str]
+
+class SourceRegistry:
+    """
+    Registro de feeds no SQLite + leases para dividir o trabalho entre processos.
+    Um worker "aluga" um shard de fontes vencidas por lease_s segundos;
+    ninguém mais pega essas fontes até o lease expirar ou ser liberado.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with self._conn() as con:
+            con.executescript(SCHEMA)
+            con.executescript(SCHEDULER_SCHEMA)
+
+    def _conn(self):
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def sync(self, sources: Optional[Sequence[Source]] = None) -> int:
+        """Carrega/atualiza fontes (padrão: load_sources(), i.e. config/env)."""
+        sources = load_sources() if sources is None else sources
+        con = self._conn()
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            con.executemany(
+                """INSERT INTO sources(name, url, region) VALUES(?, ?, ?)
+                   ON CONFLICT(name) DO UPDATE SET url = excluded.url, region = excluded.region""",
+                [(name, url, region or DEFAULT_REGION) for name, url, region in sources]
+            )
+            con.execute("COMMIT")
+        finally:
+            con.close()
+        return len(sources)
+
+    def set_enabled(self, name: str, enabled: bool) -> None:
+        con = self._conn()
+        try:
+            con.execute("UPDATE sources SET enabled = ? WHERE name = ?", (int(enabled), name))
+        finally:
+            con.close()
+
+    def all(self, enabled_only: bool = True) -> List[Source]:
+        con = self._conn()
+        try:
+            cur = con.execute(
+                "SELECT name, url, region FROM sources"
+                + (" WHERE enabled = 1" if enabled_only else "")
+                + " ORDER BY name"
+            )
+            return [tuple(r) for r in cur.fetchall()]
+        finally:
+            con.close()
+
+    def claim(self, worker_id: str, n: int, lease_s: float = 300,
+              now: Optional[float] = None, force: bool = False) -> List[Source]:
+        """
+        Aluga até n fontes habilitadas, sem lease ativo e vencidas no scheduler
+        (com force, também as saudáveis ainda não vencidas: ver SourceScheduler.due).
+        """
+        now = time.time() if now is None else now
+        con = self._conn()
+        try:
+            con.execute("BEGIN IMMEDIATE")  # um claim por vez no banco inteiro
+            rows = con.execute(
+                """SELECT s.name, s.url, s.region
+                   FROM sources s
+                   LEFT JOIN source_state st ON st.source = s.name
+                   WHERE s.enabled = 1
+                     AND s.lease_until < ?
+                     AND (COALESCE(st.next_poll_at, 0) <= ?
+                          OR (? AND COALESCE(st.failures, 0) = 0
+                                AND COALESCE(st.circuit, 'closed') = 'closed'))
+                   ORDER BY COALESCE(st.next_poll_at, 0)
+                   LIMIT ?""",
+                (now, now, int(force), n)
+            ).fetchall()
+            con.executemany(
+                "UPDATE sources SET lease_owner = ?, lease_until = ? WHERE name = ?",
+                [(worker_id, now + lease_s, r[0]) for r in rows]
+            )
+            con.execute("COMMIT")
+            return [tuple(r) for r in rows]
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        finally:
+            con.close()
+
+    def release(self, worker_id: str, names: Sequence[str]) -> None:
+        con = self._conn()
+        try:
+            con.executemany(
+                """UPDATE sources SET lease_owner = NULL, lease_until = 0
+                   WHERE name = ? AND lease_owner = ?""",
+                [(name, worker_id) for name in names]
+            )
+        finally:
+            con.close()
+
+if __name__ == "__main__":
+    # python -m infra.source_registry [db_path]   (a partir de src/)
+    # importa RSS_SOURCES / DOOMSDAY_SOURCES para a tabela sources
+    import os
+    import sys
+
+    db = sys.argv[1] if len(sys.argv) > 1 else os.path.join("data", "doomsday.db")
+    print(f"{SourceRegistry(db).sync()} fontes sincronizadas em {db}")
@@ -0,0 +1,181 @@
+# src/infra/source_scheduler.py
+from __future__ import annotations
+
+import random
+import sqlite3
+import time
+from dataclasses import dataclass, replace
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS source_state (
+  source TEXT PRIMARY KEY,
+  interval_s REAL NOT NULL,
+  next_poll_at REAL NOT NULL DEFAULT 0,
+  last_poll_at REAL,
+  last_success_at REAL,
+  rate_per_hour REAL,
+  failures INTEGER NOT NULL DEFAULT 0,
+  circuit TEXT NOT NULL DEFAULT 'closed',   -- closed | open | half_open
+  open_for_s REAL NOT NULL DEFAULT 0,
+  last_error TEXT
+);
+"""
+
+@dataclass(frozen=True)
+class SchedulerConfig:
+    min_interval_s: float = 10 * 60        # feed rápido: no máximo a cada 10 min
+    max_interval_s: float = 6 * 3600       # feed lento: pelo menos a cada 6h
+    default_interval_s: float = 30 * 60    # sem dados de taxa ainda
+    target_new_items: float = 2.0          # polla quando ~N itens novos são esperados
+    rate_window_h: float = 48.0            # só entradas recentes entram na taxa
+    ewma_alpha: float = 0.3
+    backoff_base_s: float = 60.0
+    failure_threshold: int = 3             # falhas seguidas para abrir o circuito
+    open_base_s: float = 30 * 60
+    open_max_s: float = 24 * 3600
+
+@dataclass(frozen=True)
+class SourceState:
+    source: str
+    interval_s: float
+    next_poll_at: float
+    last_poll_at: Optional[float]
+    last_success_at: Optional[float]
+    rate_per_hour: Optional[float]
+    failures: int
+    circuit: str
+    open_for_s: float
+    last_error: Optional[str]
+
+def estimate_rate_per_hour(entry_ts: Iterable[float], now: float, window_h: float) -> Optional[float]:
+    """Itens/hora a partir dos timestamps das entradas do feed (None se não dá para estimar)."""
+    ts = sorted(t for t in entry_ts if 0 < t <= now and now - t <= window_h * 3600)
+    if len(ts) < 2:
+        return None
+    span_h = max((now - ts[0]) / 3600.0, 1 / 60)
+    return len(ts) / span_h
+
+class SourceScheduler:
+    """
+    Agenda adaptativa por fonte, persistida no SQLite:
+    - aprende a taxa de publicação (EWMA) e polla quando ~target_new_items são esperados;
+    - backoff exponencial com jitter a cada falha;
+    - circuit breaker: após failure_threshold falhas o feed fica "open" e só volta
+      com uma tentativa "half_open"; falhar de novo dobra o tempo aberto.
+    """
+
+    def __init__(self, db_path: str, cfg: SchedulerConfig = SchedulerConfig()):
+        self.db_path = db_path
+        self.cfg = cfg
+        with self._conn() as con:
+            con.executescript(SCHEMA)
+
+    def _conn(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _load(self, con, source: str) -> SourceState:
+        row = con.execute(
+            """SELECT source, interval_s, next_poll_at, last_poll_at, last_success_at,
+                      rate_per_hour, failures, circuit, open_for_s, last_error
+               FROM source_state WHERE source = ?""",
+            (source,)
+        ).fetchone()
+        if row is None:
+            return SourceState(source, self.cfg.default_interval_s, 0.0, None, None,
+                               None, 0, "closed", 0.0, None)
+        return SourceState(*row)
+
+    def _save(self, con, st: SourceState) -> None:
+        con.execute(
+            """INSERT OR REPLACE INTO source_state(source, interval_s, next_poll_at, last_poll_at,
+                   last_success_at, rate_per_hour, failures, circuit, open_for_s, last_error)
+               VALUES(?,?,?,?,?,?,?,?,?,?)""",
+            (st.source, st.interval_s, st.next_poll_at, st.last_poll_at, st.last_success_at,
+             st.rate_per_hour, st.failures, st.circuit, st.open_for_s, st.last_error)
+        )
+
+    def due(self, sources: Sequence[Tuple], now: Optional[float] = None,
+            force: bool = False) -> List[Tuple]:
+        """
+        Filtra as fontes (tuplas com o nome na posição 0) que já devem ser polladas.
+        force=True (refresh manual) ignora o intervalo aprendido das fontes
+        saudáveis, mas não o backoff de falhas nem o circuito aberto.
+        """
+        now = time.time() if now is None else now
+        out = []
+        with self._conn() as con:
+            for src in sources:
+                st = self._load(con, src[0])
+                healthy = st.failures == 0 and st.circuit == "closed"
+                if st.next_poll_at > now and not (force and healthy):
+                    continue
+                if st.circuit == "open":
+                    # tempo aberto expirou: uma tentativa de prova
+                    self._save(con, replace(st, circuit="half_open"))
+                out.append(src)
+        return out
+
+    def record_success(self, source: str, entry_ts: Iterable[float], now: Optional[float] = None) -> SourceState:
+        now = time.time() if now is None else now
+        cfg = self.cfg
+        with self._conn() as con:
+            st = self._load(con, source)
+            rate = estimate_rate_per_hour(entry_ts, now, cfg.rate_window_h)
+            if rate is not None:
+                rate = rate if st.rate_per_hour is None else (
+                    cfg.ewma_alpha * rate + (1 - cfg.ewma_alpha) * st.rate_per_hour)
+            else:
+                rate = st.rate_per_hour
+
+            if rate:
+                interval = cfg.target_new_items / rate * 3600.0
+            else:
+                interval = cfg.max_interval_s  # feed parado: polla raramente
+            interval = max(cfg.min_interval_s, min(cfg.max_interval_s, interval))
+
+            new = SourceState(
+                source=source, interval_s=interval, next_poll_at=now + interval,
+                last_poll_at=now, last_success_at=now, rate_per_hour=rate,
+                failures=0, circuit="closed", open_for_s=0.0, last_error=None,
+            )
+            self._save(con, new)
+        return new
+
+    def record_failure(self, source: str, error: str, now: Optional[float] = None) -> SourceState:
+        now = time.time() if now is None else now
+        cfg = self.cfg
+        with self._conn() as con:
+            st = self._load(con, source)
+            failures = st.failures + 1
+            circuit = st.circuit
+            open_for = st.open_for_s
+
+            if st.circuit == "half_open":
+                circuit, open_for = "open", min(cfg.open_max_s, max(cfg.open_base_s, open_for * 2))
+            elif failures >= cfg.failure_threshold:
+                circuit, open_for = "open", cfg.open_base_s
+
+            if circuit == "open":
+                wait = open_for
+            else:
+                wait = min(cfg.max_interval_s, cfg.backoff_base_s * 2 ** (failures - 1))
+            wait *= random.uniform(0.8, 1.2)  # jitter: evita fontes sincronizadas
+
+            new = SourceState(
+                source=source, interval_s=st.interval_s, next_poll_at=now + wait,
+                last_poll_at=now, last_success_at=st.last_success_at,
+                rate_per_hour=st.rate_per_hour, failures=failures, circuit=circuit,
+                open_for_s=open_for, last_error=str(error)[:500],
+            )
+            self._save(con, new)
+        return new
+
+    def states(self) -> List[SourceState]:
+        with self._conn() as con:
+            cur = con.execute(
+                """SELECT source, interval_s, next_poll_at, last_poll_at, last_success_at,
+                          rate_per_hour, failures, circuit, open_for_s, last_error
+                   FROM source_state ORDER BY source"""
+            )
+            return [SourceState(*r) for r in cur.fetchall()]
@@ -0,0 +1,71 @@
+# src/infra/sources.py
+import json
+import os
+from typing import Dict, List, Tuple
+
+DEFAULT_REGION = "Global"
+
+# (nome, url, região) — regiões seguem o collector legado (rss_sources)
+RSS_SOURCES: List[Tuple[str, str, str]] = [
+    ("Reuters", "https://www.reuters.com/rssFeed/topNews", "Global"),
+    ("BBC", "http://feeds.bbci.co.uk/news/rss.xml", "Europa"),
+    ("The Guardian", "https://www.theguardian.com/world/rss", "Europa"),
+    ("Al Jazeera", "https://www.aljazeera.com/xml/rss/all.xml", "Oriente_Medio"),
+
+    # --- AMÉRICAS ---
+    ("NYT_World", "https://rss.nytimes.com/services/xml/rss/nyt/World.xml", "USA"),
+    ("G1_Mundo", "https://g1.globo.com/dynamo/mundo/rss2.xml", "Brasil"),
+
+    # --- EUROPA/RUSSIA/UCRÂNIA ---
+    ("BBC_World", "http://feeds.bbci.co.uk/news/world/rss.xml", "Europa"),
+    ("TASS_Russia", "https://tass.com/rss/v2.xml", "Russia"),
+    ("KyivIndependent", "https://kyivindependent.com/rss/", "Ucrania"),
+
+    # --- ORIENTE MÉDIO ---
+    ("Jerusalem_Post", "https://www.jpost.com/rss/rssfeedsheadlines.aspx", "Israel"),
+    ("AlJazeera_English", "https://www.aljazeera.com/xml/rss/all.xml", "Oriente_Medio"),
+    ("Tehran_Times", "https://www.tehrantimes.com/rss", "Ira"),
+
+    # --- ÁSIA ---
+    ("Global_Times_China", "https://www.globaltimes.cn/rss/index.xml", "China"),
+    ("Taipei_Times", "https://www.taipeitimes.com/xml/index.xml", "Taiwan"),
+]
+
+SOURCE_REGIONS: Dict[str, str] = {name: region for name, _, region in RSS_SOURCES}
+
+# hotspots do dashboard: soma dos agregados das regiões de cada lado
+REGION_GROUPS: Dict[str, Tuple[str, ...]] = {
+    "Rússia–Ucrânia": ("Russia", "Ucrania"),
+    "Israel–Irã": ("Israel", "Ira", "Oriente_Medio"),
+    "China–Taiwan": ("China", "Taiwan"),
+}
+
+def region_of(source: str) -> str:
+    return SOURCE_REGIONS.get(source, DEFAULT_REGION)
+
+def _parse_sources(data) -> List[Tuple[str, str, str]]:
+    out = []
+    for s in data:
+        if isinstance(s, dict):
+            out.append((s["name"], s["url"], s.get("region", DEFAULT_REGION)))
+        else:
+            out.append((s[0], s[1], s[2] if len(s) > 2 else DEFAULT_REGION))
+    return out
+
+def load_sources() -> List[Tuple[str, str, str]]:
+    """
+    Lista de feeds a coletar. Padrão: RSS_SOURCES.
+    DOOMSDAY_SOURCES aponta para um JSON ([nome, url, região] ou {name, url, region}),
+    como arquivo local ou URL — ex.: o /sources.json do servidor de replay.
+    """
+    spec = os.getenv("DOOMSDAY_SOURCES")
+    if not spec:
+        return RSS_SOURCES
+    if spec.startswith(("http://", "https://")):
+        from infra.http_client import get_client
+
+        r = get_client().get(spec)
+        r.raise_for_status()
+        return _parse_sources(json.loads(r.content))
+    with open(spec, encoding="utf-8") as fh:
+        return _parse_sources(json.load(fh))
@@ -0,0 +1,86 @@
+# src/infra/summary_codec.py
+from __future__ import annotations
+
+import html
+import re
+import struct
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+ZDICT_SIZE = 32 * 1024   # janela do deflate: dicionário maior que isso não ajuda
+_HEADER = struct.Struct(">H")  # id do dicionário (0 = sem dicionário)
+
+_TAG = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"\s+")
+
+def strip_html(text: str) -> str:
+    """Remove tags e entidades HTML e normaliza espaços."""
+    return _SPACES.sub(" ", html.unescape(_TAG.sub(" ", text or ""))).strip()
+
+def train_zdict(samples: Iterable[str], size: int = ZDICT_SIZE, max_ngram: int = 4) -> bytes:
+    """
+    zlib não treina dicionários: monta um com os n-gramas de palavras que mais
+    economizam no corpus (frequência x tamanho). Os mais valiosos ficam no fim,
+    onde o deflate os alcança com distâncias menores.
+    """
+    counts: Counter = Counter()
+    for text in samples:
+        words = text.split()
+        for n in range(1, max_ngram + 1):
+            for i in range(len(words) - n + 1):
+                counts[" ".join(words[i:i + n])] += 1
+
+    picked = []
+    used = 0
+    for gram, c in sorted(counts.items(), key=lambda kv: kv[1] * len(kv[0]), reverse=True):
+        if c < 2:
+            break
+        cost = len(gram.encode("utf-8")) + 1
+        if used + cost > size:
+            continue
+        picked.append(gram)
+        used += cost
+    return " ".join(reversed(picked)).encode("utf-8")
+
+class SummaryCodec:
+    """
+    Comprime resumos com zlib + dicionário treinado no corpus. O blob leva o
+    id do dicionário no cabeçalho: dicionários novos convivem com linhas antigas.
+    """
+
+    def __init__(self, dicts: Optional[Dict[int, bytes]] = None, current: int = 0):
+        self.dicts = dict(dicts or {})
+        self.current = current
+
+    def encode(self, text: str) -> bytes:
+        if self.current:
+            c = zlib.compressobj(9, zlib.DEFLATED, -15, zdict=self.dicts[self.current])
+        else:
+            c = zlib.compressobj(9, zlib.DEFLATED, -15)
+        return _HEADER.pack(self.current) + c.compress(text.encode("utf-8")) + c.flush()
+
+    def decode(self, blob: bytes) -> str:
+        """KeyError se o dicionário do blob não é conhecido (recarregar e tentar de novo)."""
+        (dict_id,) = _HEADER.unpack_from(blob)
+        if dict_id:
+            d = zlib.decompressobj(-15, zdict=self.dicts[dict_id])
+        else:
+            d = zlib.decompressobj(-15)
+        return (d.decompress(blob[_HEADER.size:]) + d.flush()).decode("utf-8")
+
+if __name__ == "__main__":
+    # python -m infra.summary_codec ../data/doomsday.db [--retrain]   (a partir de src/)
+    import argparse
+    import json
+    import os
+
+    from infra.repository import SQLiteRepo
+
+    parser = argparse.ArgumentParser(description="Treina o dicionário e comprime os resumos gravados.")
+    parser.add_argument("db", nargs="?", default=os.path.join("data", "doomsday.db"))
+    parser.add_argument("--retrain", action="store_true", help="treina um dicionário novo mesmo já havendo um")
+    args = parser.parse_args()
+
+    repo = SQLiteRepo(args.db, compress_summaries=True)
+    print(json.dumps(repo.compact_summaries(retrain=args.retrain), indent=2))
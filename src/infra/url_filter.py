@@ -0,0 +1,138 @@
+# src/infra/url_filter.py
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+if TYPE_CHECKING:  # repository importa canonicalize_url (migração das urls antigas)
+    from infra.repository import SQLiteRepo
+
+# parâmetros de rastreamento que não mudam o conteúdo da página
+TRACKING_PREFIXES = ("utm_", "mc_", "pk_", "ga_")
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "ocid", "cmpid", "icid",
+    "smid", "smtyp", "ref_src", "at_medium", "at_campaign",
+}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+# reconstrução completa periódica (remoções da retenção, rowids reaproveitados)
+REBUILD_S = 3600.0
+
+def canonicalize_url(url: str) -> str:
+    """
+    Forma canônica para de-duplicação: esquema/host em minúsculas, sem porta padrão,
+    sem fragmento, sem parâmetros de rastreamento (utm_*, fbclid, ...).
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        host = f"[{host}]"  # IPv6: hostname vem sem colchetes
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host
+    if port and _DEFAULT_PORTS.get(scheme) != port:
+        netloc = f"{host}:{port}"
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ])
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+class BloomFilter:
+    """Bloom filter simples (bytearray + double hashing com blake2b)."""
+
+    def __init__(self, capacity: int, fp_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.m = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        d = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(d[:8], "little")
+        h2 = int.from_bytes(d[8:], "little") | 1
+        return ((h1 + i * h2) % self.m for i in range(self.k))
+
+    def add(self, key: str) -> None:
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+class KnownUrlFilter:
+    """
+    "Essa URL já está no banco?" em duas etapas:
+    Bloom filter em memória (reconstruído de news.url) descarta a maioria
+    sem I/O; só positivos vão para a checagem exata no SQLite.
+    refresh() traz o que outros processos gravaram (rowid > último visto).
+    """
+
+    def __init__(self, repo: SQLiteRepo, fp_rate: float = 0.01, rebuild_s: float = REBUILD_S):
+        self.repo = repo
+        self.fp_rate = fp_rate
+        self.rebuild_s = rebuild_s
+        self._lock = threading.Lock()
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        rows = list(self.repo.iter_urls())
+        bloom = BloomFilter(capacity=max(10_000, 2 * len(rows)), fp_rate=self.fp_rate)
+        for _, u in rows:
+            bloom.add(canonicalize_url(u))
+        with self._lock:
+            self._bloom = bloom
+            self._last_rowid = rows[-1][0] if rows else 0
+            self._built_at = time.monotonic()
+
+    def refresh(self) -> None:
+        """Incremental pelo rowid (uma query curta); a cada rebuild_s, reconstrói tudo."""
+        if time.monotonic() - self._built_at >= self.rebuild_s:
+            self.rebuild()
+            return
+        rows = list(self.repo.iter_urls(after_rowid=self._last_rowid))
+        if not rows:
+            return
+        with self._lock:
+            for _, u in rows:
+                self._bloom.add(canonicalize_url(u))
+            self._last_rowid = max(self._last_rowid, rows[-1][0])
+            full = self._bloom.count > self._bloom.capacity
+        if full:
+            self.rebuild()
+
+    def add(self, url: str) -> None:
+        with self._lock:
+            self._bloom.add(canonicalize_url(url))
+            full = self._bloom.count > self._bloom.capacity
+        if full:
+            self.rebuild()
+
+    def is_known(self, url: str) -> bool:
+        canon = canonicalize_url(url)
+        if not canon or canon not in self._bloom:
+            return False
+        return self.repo.has_url(canon)
+
+_filters: Dict[str, KnownUrlFilter] = {}
+_filters_lock = threading.Lock()
+
+def get_known_filter(repo: SQLiteRepo) -> KnownUrlFilter:
+    """Um filtro por banco, construído na primeira chamada do processo."""
+    with _filters_lock:
+        f = _filters.get(repo.db_path)
+        if f is None:
+            f = _filters[repo.db_path] = KnownUrlFilter(repo)
+    return f